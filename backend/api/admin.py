@@ -7,7 +7,11 @@ from .models import (
     Donation,
     DonationHistory,
     BloodBank,
-    DonationLog
+    DonationLog,
+    Inventory,
+    DailyInventoryRollup,
+    Notification,
+    Broadcast
 )
 
 @admin.register(UserProfile)
@@ -36,4 +40,29 @@ class DonationHistoryAdmin(admin.ModelAdmin):
     search_fields = ('donor__user__username',)
 
 admin.site.register(BloodBank)
-admin.site.register(DonationLog) 
\ No newline at end of file
+admin.site.register(DonationLog)
+
+@admin.register(Inventory)
+class InventoryAdmin(admin.ModelAdmin):
+    list_display = ('blood_bank', 'blood_group', 'units', 'updated_at')
+    list_filter = ('blood_group', 'blood_bank')
+    readonly_fields = ('blood_bank', 'blood_group', 'units', 'updated_at')
+
+@admin.register(DailyInventoryRollup)
+class DailyInventoryRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'blood_bank', 'blood_group', 'log_type', 'units', 'count')
+    list_filter = ('log_type', 'blood_group', 'blood_bank')
+    date_hierarchy = 'day'
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('donor', 'channel', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'channel')
+    search_fields = ('donor__user__username', 'subject')
+    raw_id_fields = ('donor', 'sender')
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ('blood_group', 'radius_km', 'channel', 'recipient_count', 'duplicate_count', 'created_at')
+    list_filter = ('blood_group', 'channel')
+    readonly_fields = ('recipient_count', 'duplicate_count', 'created_at')
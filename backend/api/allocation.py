@@ -0,0 +1,132 @@
+"""
+Greedy cross-bank allocation of stock to pending donation requests.
+
+Requests are served oldest first in two passes over the current
+Inventory. The first pass only uses the requested group itself, so
+substitutes are not spent while exact stock exists anywhere. The second
+pass fills what is left from compatible substitutes, least versatile
+group first, so universal O- is used last. Within a group the request's
+own bank is drawn first, then the banks holding the most of that group,
+which keeps the number of transfers down.
+
+The planner only reads; it proposes a plan and changes no stock.
+"""
+from .compatibility import compatible_donor_groups, compatible_recipient_groups
+from .models import DonationRequest, Inventory
+
+
+def substitution_order(recipient_group):
+    """
+    Donor groups a recipient can take, exact group first, then the
+    substitutes that can serve the fewest other groups.
+    """
+    substitutes = [group for group in compatible_donor_groups(recipient_group) if group != recipient_group]
+    substitutes.sort(key=lambda group: len(compatible_recipient_groups(group)))
+    return [recipient_group, *substitutes]
+
+
+def _draw(stock, group, units, home_bank, allocations):
+    """Take up to ``units`` of ``group``, home bank first; return units still needed."""
+    banks = stock.get(group)
+    if not banks:
+        return units
+
+    order = []
+    if banks.get(home_bank, 0) > 0:
+        order.append(home_bank)
+    order.extend(sorted(
+        (bank for bank, available in banks.items() if available > 0 and bank != home_bank),
+        key=lambda bank: -banks[bank]
+    ))
+
+    for bank in order:
+        if not units:
+            break
+        taken = min(units, banks[bank])
+        banks[bank] -= taken
+        if not banks[bank]:
+            del banks[bank]
+        units -= taken
+        allocations.append({
+            'blood_bank': bank,
+            'blood_group': group,
+            'units': taken,
+            'transfer': bank != home_bank,
+        })
+    return units
+
+
+def plan_allocations(requests, stock):
+    """
+    Allocate stock to requests.
+
+    Args:
+        requests (list): (request_id, blood_bank_id, blood_group, units),
+            in priority order
+        stock (dict): Units keyed by (blood_bank_id, blood_group); only
+            positive balances are used, and the dict is not modified
+
+    Returns:
+        list: One dict per request with its allocations and shortfall
+    """
+    # group -> {bank: units}, consumed as the plan is built
+    remaining = {}
+    for (bank, group), units in stock.items():
+        if units > 0:
+            remaining.setdefault(group, {})[bank] = units
+
+    plans = []
+    for request_id, bank, group, units in requests:
+        plan = {
+            'request': request_id,
+            'blood_bank': bank,
+            'blood_group': group,
+            'units_requested': units,
+            'allocations': [],
+            'shortfall': units,
+        }
+        plan['shortfall'] = _draw(remaining, group, units, bank, plan['allocations'])
+        plans.append(plan)
+
+    for plan in plans:
+        for group in substitution_order(plan['blood_group']):
+            if not plan['shortfall']:
+                break
+            if group != plan['blood_group']:
+                plan['shortfall'] = _draw(
+                    remaining, group, plan['shortfall'], plan['blood_bank'], plan['allocations']
+                )
+    return plans
+
+
+def build_allocation_plan():
+    """
+    Plan every pending request against the current inventory.
+
+    Returns:
+        dict: The per-request plans plus totals
+    """
+    requests = list(
+        DonationRequest.objects.filter(status='pending')
+        .order_by('request_date', 'id')
+        .values_list('id', 'blood_bank_id', 'blood_group', 'units')
+    )
+    stock = {
+        (bank, group): units
+        for bank, group, units in Inventory.objects.values_list('blood_bank_id', 'blood_group', 'units')
+    }
+
+    plans = plan_allocations(requests, stock)
+    requested = sum(plan['units_requested'] for plan in plans)
+    shortfall = sum(plan['shortfall'] for plan in plans)
+    return {
+        'requests': len(plans),
+        'units_requested': requested,
+        'units_allocated': requested - shortfall,
+        'shortfall': shortfall,
+        'transfers': sum(
+            1 for plan in plans for allocation in plan['allocations'] if allocation['transfer']
+        ),
+        'fully_allocated': sum(1 for plan in plans if not plan['shortfall']),
+        'plans': plans,
+    }
@@ -0,0 +1,115 @@
+"""
+Native async versions of the hot read endpoints.
+
+These are plain Django coroutine views using the async ORM, so under an
+ASGI server (``uvicorn core.asgi:application``) one worker can overlap
+many in-flight requests instead of holding a thread per request. None of
+them call the C++ calculator: compatibility comes from the in-process
+matrix and availability from a database aggregate.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponseNotAllowed, JsonResponse
+
+from . import compatibility
+from .donor_locator import get_donor_locator
+from .medical_conditions import exclude_conditions
+from .models import BloodBank, Donation, Donor
+from .serializers import BloodBankSerializer, DonorSerializer
+from .utils import aaggregate_blood_availability, nearby_donor_queryset, parse_nearby_params
+
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+async def blood_bank_list(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    # Keyset pagination on (name, id), the same order as the synchronous
+    # directory; the cursor is the name and id of the last bank seen
+    after_name = request.GET.get('after_name')
+    try:
+        after = int(request.GET.get('after', 0))
+        page_size = min(int(request.GET.get('page_size', settings.REST_FRAMEWORK['PAGE_SIZE'])),
+                        settings.API_MAX_PAGE_SIZE)
+    except ValueError:
+        return _error('Invalid parameters', 400)
+    if page_size < 1:
+        return _error('Invalid parameters', 400)
+
+    queryset = BloodBank.objects.order_by('name', 'id')
+    if after_name is not None:
+        queryset = queryset.filter(Q(name__gt=after_name) | Q(name=after_name, id__gt=after))
+    banks = [bank async for bank in queryset[:page_size]]
+    full = len(banks) == page_size
+    return JsonResponse({
+        'results': BloodBankSerializer(banks, many=True).data,
+        'next_after_name': banks[-1].name if full else None,
+        'next_after': banks[-1].id if full else None,
+    })
+
+
+async def blood_bank_availability(request, pk):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    if not await BloodBank.objects.filter(pk=pk).aexists():
+        return _error('Not found.', 404)
+
+    donations = Donation.objects.filter(blood_bank_id=pk)
+    return JsonResponse(await aaggregate_blood_availability(donations))
+
+
+async def nearby_donors(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    try:
+        params = parse_nearby_params(request.GET)
+    except ValueError:
+        return _error('Invalid parameters', 400)
+
+    limit = params.pop('limit')
+    candidates = Donor.objects.select_related('user', 'location')
+    excluded = request.GET.get('exclude_conditions')
+    if excluded:
+        try:
+            candidates = exclude_conditions(candidates, excluded)
+        except ValueError as e:
+            return _error(str(e), 400)
+
+    if settings.DONOR_NEARBY_BACKEND == 'memory':
+        # The first call loads the locator from the database
+        locator = await sync_to_async(get_donor_locator)()
+        matches = locator.within_radius(
+            params['latitude'], params['longitude'], params['radius_km'],
+            blood_groups=[params['blood_group']] if params['blood_group'] else None,
+            is_available=params['is_available'],
+            limit=None if excluded else limit
+        )
+        found = await candidates.ain_bulk([donor_id for donor_id, _ in matches])
+        donors = [found[donor_id] for donor_id, _ in matches if donor_id in found][:limit]
+    else:
+        queryset = nearby_donor_queryset(**params, donors=candidates)
+        if limit is not None:
+            queryset = queryset[:limit]
+        donors = [donor async for donor in queryset]
+
+    # Relations are already joined, so serialization runs no queries
+    return JsonResponse(DonorSerializer(donors, many=True).data, safe=False)
+
+
+async def compatibility_check(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    donor = request.GET.get('donor')
+    recipient = request.GET.get('recipient')
+    if not donor or not recipient:
+        return _error('Donor and recipient blood groups are required', 400)
+
+    result = compatibility.check_compatibility(donor, recipient)
+    return JsonResponse(result, status=400 if 'error' in result else 200)
@@ -1,13 +1,11 @@
-import subprocess
 import json
-import os
-from pathlib import Path
+from . import compatibility
+from .calculator_pool import CALCULATOR_EXECUTABLE, get_calculator_pool
 
 class BloodCalculator:
     def __init__(self):
         # Get the absolute path to the blood_calculator executable
-        cpp_dir = Path(__file__).parent.parent / 'cpp'
-        self.executable_path = cpp_dir / 'build' / 'blood_calculator'
+        self.executable_path = CALCULATOR_EXECUTABLE
         
         # Ensure the executable exists
         if not self.executable_path.exists():
@@ -15,26 +13,8 @@ class BloodCalculator:
 
     def _run_calculator(self, input_data):
         try:
-            # Convert input data to JSON string
-            input_json = json.dumps(input_data)
-            
-            # Run the C++ executable with the JSON input
-            process = subprocess.Popen(
-                [str(self.executable_path)],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            # Send input and get output
-            stdout, stderr = process.communicate(input=input_json)
-            
-            if process.returncode != 0:
-                raise RuntimeError(f"Blood calculator error: {stderr}")
-            
-            # Parse and return the JSON response
-            return json.loads(stdout)
+            # Send the request to a pooled worker process
+            return get_calculator_pool().run(input_data)
             
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON response from blood calculator: {e}")
@@ -56,12 +36,8 @@ class BloodCalculator:
                 - isUniversalDonor (bool): Whether donor is universal
                 - isUniversalRecipient (bool): Whether recipient is universal
         """
-        input_data = {
-            "operation": "check_compatibility",
-            "donor": donor_blood_group,
-            "recipient": recipient_blood_group
-        }
-        return self._run_calculator(input_data)
+        # Answered from the precomputed matrix; no calculator round trip
+        return compatibility.check_compatibility(donor_blood_group, recipient_blood_group)
 
     def search_donations(self, donations, blood_group=None, location=None, 
                         date_range=None, available_only=True):
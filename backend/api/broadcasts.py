@@ -0,0 +1,126 @@
+"""
+Emergency broadcasts: one message to every eligible compatible donor
+within a radius, queued in the notification outbox in bulk.
+
+Recipients are resolved by a single query combining compatibility
+expansion, eligibility, excluded conditions, the radius's bounding box
+and a flag for donors a recent broadcast already reached; only the exact
+distance check runs in Python. Reached donors are skipped so overlapping
+broadcasts do not message the same people twice within
+BROADCAST_DEDUPE_WINDOW seconds; messages that failed do not count.
+Broadcasts sharing donors are serialized so both cannot miss the other.
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Count, Exists, FloatField, OuterRef, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .geo import haversine_km
+from .matching import compatible_candidates
+from .models import Broadcast, Notification
+from .notifications import notification_settings
+from .sqlite import write_transaction
+
+
+def _queue_notifications(donor_ids, **values):
+    """
+    Insert one pending Notification per donor with a single prepared
+    statement. Every column but donor_id is the same for all rows, so
+    field values are prepared once; bulk_create would prepare each field
+    of each row, which dominates the cost of a large fan-out. Defaults,
+    callable ones included, are therefore evaluated once and shared by
+    every row.
+    """
+    meta = Notification._meta
+    fields = [field for field in meta.concrete_fields if not field.primary_key]
+    template = Notification(**values)
+    row = [field.get_db_prep_save(field.pre_save(template, add=True), connection) for field in fields]
+    donor_column = fields.index(meta.get_field('donor'))
+
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    sql = f'INSERT INTO {connection.ops.quote_name(meta.db_table)} ({columns}) VALUES ({placeholders})'
+
+    def rows():
+        for donor_id in donor_ids:
+            row[donor_column] = donor_id
+            yield tuple(row)
+
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows())
+
+
+def create_broadcast(created_by, blood_group, latitude, longitude, radius_km, message,
+                     subject='', channel='sms', excluded_conditions=''):
+    """
+    Record a broadcast and queue a notification for each new recipient.
+
+    Returns:
+        Broadcast: The saved broadcast with recipient and duplicate counts
+
+    Raises:
+        ValueError: If excluded_conditions names an unknown condition
+    """
+    window = timedelta(seconds=notification_settings()['BROADCAST_DEDUPE_WINDOW'])
+    # Failed messages never reached the donor, so they do not count
+    recently_reached = Notification.objects.filter(
+        donor_id=OuterRef('pk'),
+        broadcast__created_at__gte=timezone.now() - window
+    ).exclude(status='failed')
+    candidates = compatible_candidates(
+        blood_group, latitude, longitude, radius_km,
+        exclude_user=created_by, excluded_conditions=excluded_conditions or None
+    )
+    rows = (
+        candidates
+        .annotate(
+            donor_lat=Cast('location__latitude', FloatField()),
+            donor_lon=Cast('location__longitude', FloatField()),
+            reached=Exists(recently_reached)
+        )
+        .values_list('id', 'donor_lat', 'donor_lon', 'reached')
+    )
+
+    # Overlapping broadcasts must not both see a shared donor as not yet
+    # reached. SQLite has no row locks, so there every broadcast takes the
+    # database write lock whatever SQLITE_WRITE_LOCK says. Elsewhere the
+    # candidate rows are locked in key order first: a broadcast sharing
+    # donors with this one waits until it commits, and the query below,
+    # a new statement, then sees its notifications.
+    with write_transaction(lock=True):
+        locked = None
+        if connection.features.has_select_for_update:
+            locked = set(candidates.select_for_update().order_by('pk').values_list('pk', flat=True))
+
+        recipients, duplicates = [], 0
+        for donor_id, donor_lat, donor_lon, reached in rows:
+            if locked is not None and donor_id not in locked:
+                continue
+            if haversine_km(latitude, longitude, donor_lat, donor_lon) > radius_km:
+                continue
+            if reached:
+                duplicates += 1
+            else:
+                recipients.append(donor_id)
+
+        broadcast = Broadcast.objects.create(
+            created_by=created_by, blood_group=blood_group, latitude=latitude, longitude=longitude,
+            radius_km=radius_km, excluded_conditions=excluded_conditions or '', channel=channel,
+            subject=subject, message=message,
+            recipient_count=len(recipients), duplicate_count=duplicates
+        )
+        _queue_notifications(
+            recipients, sender=created_by, broadcast=broadcast, channel=channel,
+            subject=subject, body=message, next_attempt_at=timezone.now()
+        )
+    return broadcast
+
+
+def with_progress(broadcasts):
+    """Annotate a Broadcast queryset with outbox counts per delivery status."""
+    return broadcasts.annotate(**{
+        status: Count('notifications', filter=Q(notifications__status=status))
+        for status, _ in Notification.STATUS_CHOICES
+    })
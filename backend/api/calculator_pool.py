@@ -0,0 +1,280 @@
+import atexit
+import json
+import os
+import queue
+import select
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from .calculator_wire import encode_request
+
+CALCULATOR_EXECUTABLE = Path(__file__).parent.parent / 'cpp' / 'build' / 'blood_calculator'
+
+DEFAULT_POOL_SETTINGS = {
+    'SIZE': 4,
+    'MAX_QUEUE': 16,
+    'ACQUIRE_TIMEOUT': 5.0,
+    'HEALTH_CHECK_INTERVAL': 30.0,
+    'REQUEST_TIMEOUT': 30.0,
+    'WIRE_ENCODING': 'auto',
+    'PACKED_MIN_DONATIONS': 1000,
+}
+
+
+class CalculatorPoolBusy(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class CalculatorWorker:
+    """
+    A long-lived blood_calculator process that answers one JSON request
+    per line on stdin with one JSON response per line on stdout.
+
+    When ``negotiate`` is set the worker asks the binary which request
+    encodings it understands on start; binaries that predate the
+    ``capabilities`` operation are left on plain JSON.
+
+    A worker that does not answer within ``timeout`` seconds is killed,
+    so a hung binary cannot hold a pool slot forever.
+    """
+
+    def __init__(self, executable, negotiate=True, timeout=30.0):
+        self.executable = executable
+        self.negotiate = negotiate
+        self.timeout = timeout
+        self.process = None
+        self._buffer = b''
+        self.last_checked = 0.0
+        self.encodings = ('json',)
+
+    def _spawn(self):
+        self.process = subprocess.Popen(
+            [str(self.executable)],
+            bufsize=0,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self._buffer = b''
+        self.last_checked = time.monotonic()
+
+    def start(self):
+        self.stop()
+        self._spawn()
+        self.encodings = ('json',)
+        if self.negotiate:
+            try:
+                response = json.loads(self.request(json.dumps({'operation': 'capabilities'})))
+                self.encodings = tuple(response.get('encodings') or ('json',))
+            except (RuntimeError, json.JSONDecodeError):
+                # Fall back to JSON on a fresh process
+                self.stop()
+                self._spawn()
+
+    def stop(self, kill=False):
+        if self.process is None:
+            return
+        if kill:
+            self.process.kill()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def _readline(self, timeout):
+        """Read one response line, or return None once ``timeout`` seconds pass."""
+        stdout = self.process.stdout
+        if os.name == 'nt':
+            # select() only works on sockets on Windows; block instead
+            return stdout.readline()
+
+        deadline = time.monotonic() + timeout
+        while b'\n' not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([stdout], [], [], remaining)[0]:
+                return None
+            chunk = os.read(stdout.fileno(), 65536)
+            if not chunk:
+                break
+            self._buffer += chunk
+        line, newline, self._buffer = self._buffer.partition(b'\n')
+        return line + newline
+
+    def request(self, line, payload=b'', timeout=None):
+        """
+        Send a single request line, plus any binary payload, and return
+        the raw response line.
+
+        Raises:
+            RuntimeError: If the process died, closed its output or did not
+                answer within ``timeout`` (default: the worker's timeout)
+                seconds; the process is stopped in each case.
+        """
+        try:
+            self.process.stdin.write(line.encode() + b'\n' + payload)
+            self.process.stdin.flush()
+            response = self._readline(self.timeout if timeout is None else timeout)
+        except (BrokenPipeError, OSError, ValueError) as e:
+            self.stop()
+            raise RuntimeError(f"Blood calculator worker failed: {e}")
+
+        if response is None:
+            self.stop(kill=True)
+            raise RuntimeError("Blood calculator worker timed out")
+
+        if not response:
+            self.stop()
+            raise RuntimeError("Blood calculator worker exited unexpectedly")
+
+        response = response.decode()
+        if payload and '"error"' in response:
+            # A rejected packed payload may be only partly consumed, which
+            # would desynchronise the stream; start over on the next request
+            self.stop()
+        return response
+
+    def is_healthy(self, timeout=5.0):
+        if not self.is_alive():
+            return False
+        try:
+            response = json.loads(self.request(json.dumps({'operation': 'ping'}), timeout=timeout))
+        except (RuntimeError, json.JSONDecodeError):
+            return False
+        self.last_checked = time.monotonic()
+        return response.get('status') == 'ok'
+
+
+class CalculatorPool:
+    """
+    Fixed-size pool of CalculatorWorker processes shared by every caller
+    in this Python process.
+
+    At most ``size`` requests run concurrently and at most ``max_queue``
+    more wait for a free worker; anything beyond that is rejected with
+    CalculatorPoolBusy instead of piling up behind the pool. A worker is
+    respawned on checkout if it has died, or if it has sat idle longer
+    than ``health_check_interval`` and no longer answers a ping.
+
+    Requests go out as JSON unless ``wire_encoding`` is ``'auto'`` and the
+    worker supports the packed framing, in which case calculate_availability
+    calls with at least ``packed_min_donations`` donations are packed.
+    """
+
+    def __init__(self, executable=CALCULATOR_EXECUTABLE, size=4, max_queue=16,
+                 acquire_timeout=5.0, health_check_interval=30.0, request_timeout=30.0,
+                 wire_encoding='auto', packed_min_donations=1000):
+        if size < 1:
+            raise ValueError("Calculator pool size must be at least 1")
+
+        self.executable = Path(executable)
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.packed_min_donations = packed_min_donations
+
+        self._slots = threading.BoundedSemaphore(size + max_queue)
+        self._idle = queue.LifoQueue()
+        self._workers = [
+            CalculatorWorker(self.executable, negotiate=wire_encoding == 'auto', timeout=request_timeout)
+            for _ in range(size)
+        ]
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def _checkout(self):
+        try:
+            worker = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise CalculatorPoolBusy("Timed out waiting for a blood calculator worker")
+
+        try:
+            if not worker.is_alive():
+                worker.start()
+            elif time.monotonic() - worker.last_checked > self.health_check_interval:
+                if not worker.is_healthy():
+                    worker.start()
+        except OSError:
+            self._idle.put(worker)
+            raise
+        return worker
+
+    def run(self, input_data):
+        """
+        Run a single calculator operation on a pooled worker.
+
+        Args:
+            input_data (dict): The request to send to the calculator
+
+        Returns:
+            dict: The decoded response from the calculator, or None
+
+        Raises:
+            RuntimeError: If the calculator answered with an error, failed
+                or timed out
+            CalculatorPoolBusy: If no worker came free in time
+        """
+        if not self.executable.exists():
+            raise FileNotFoundError(f"Blood calculator executable not found at {self.executable}")
+
+        if not self._slots.acquire(blocking=False):
+            raise CalculatorPoolBusy("Blood calculator pool queue is full")
+
+        try:
+            worker = self._checkout()
+            try:
+                line, payload = encode_request(input_data, worker.encodings, self.packed_min_donations)
+                response = worker.request(line, payload)
+            finally:
+                self._idle.put(worker)
+        finally:
+            self._slots.release()
+
+        result = json.loads(response)
+        # Some operations answer null, e.g. availability over no donations
+        if isinstance(result, dict) and 'error' in result:
+            raise RuntimeError(f"Blood calculator error: {result['error']}")
+        return result
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.stop()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_calculator_pool():
+    """
+    Return the process-wide calculator pool, creating it from the
+    BLOOD_CALCULATOR_POOL setting on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                options = {**DEFAULT_POOL_SETTINGS, **getattr(settings, 'BLOOD_CALCULATOR_POOL', {})}
+                _pool = CalculatorPool(
+                    size=options['SIZE'],
+                    max_queue=options['MAX_QUEUE'],
+                    acquire_timeout=options['ACQUIRE_TIMEOUT'],
+                    health_check_interval=options['HEALTH_CHECK_INTERVAL'],
+                    request_timeout=options['REQUEST_TIMEOUT'],
+                    wire_encoding=options['WIRE_ENCODING'],
+                    packed_min_donations=options['PACKED_MIN_DONATIONS']
+                )
+                atexit.register(_pool.shutdown)
+    return _pool
@@ -0,0 +1,78 @@
+"""
+Compact binary framing for calculate_availability requests.
+
+A packed request is a one-line JSON header followed by a raw payload::
+
+    {"operation": "calculate_availability", "encoding": "packed", "count": N}\n
+    N x int8    blood group code (index into compatibility.BLOOD_GROUPS)
+    N x uint8   is_available flag
+    N x int32   units, native byte order
+
+Workers only receive packed requests after the binary has listed
+``packed`` in its capabilities, so older builds keep getting JSON.
+Responses are always a single JSON line.
+"""
+import json
+from array import array
+
+from .compatibility import BLOOD_GROUP_CODES
+
+PACKED_OPERATIONS = ('calculate_availability',)
+
+
+def pack_donations(donations):
+    """
+    Pack donation dictionaries into the binary payload.
+
+    Args:
+        donations (list): Dictionaries with blood_group, units and is_available
+
+    Returns:
+        bytes: The payload, or None if a donation cannot be packed
+            (unknown blood group, or units that are not a number or fall
+            outside int32); such requests go out as JSON, so the binary
+            accepts or rejects them the same way whatever the encoding
+    """
+    codes = array('b')
+    flags = array('B')
+    units = array('i')
+    try:
+        for donation in donations:
+            code = BLOOD_GROUP_CODES.get(donation.get('blood_group'))
+            if code is None:
+                return None
+            codes.append(code)
+            flags.append(1 if donation.get('is_available') else 0)
+            unit_count = donation.get('units')
+            if unit_count is not None and not isinstance(unit_count, (int, float)):
+                # int() would accept "3", which the binary's JSON parser rejects
+                return None
+            units.append(int(unit_count or 0))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return codes.tobytes() + flags.tobytes() + units.tobytes()
+
+
+def encode_request(input_data, encodings=('json',), min_packed=0):
+    """
+    Encode a calculator request for a worker.
+
+    Args:
+        input_data (dict): The request to send to the calculator
+        encodings (tuple): Encodings the worker advertised
+        min_packed (int): Smallest donation count worth packing
+
+    Returns:
+        tuple: (header line, binary payload); the payload is empty for JSON
+    """
+    if 'packed' in encodings and input_data.get('operation') in PACKED_OPERATIONS:
+        donations = input_data.get('donations') or []
+        payload = pack_donations(donations) if len(donations) >= min_packed else None
+        if payload is not None:
+            header = {
+                'operation': input_data['operation'],
+                'encoding': 'packed',
+                'count': len(donations),
+            }
+            return json.dumps(header), payload
+    return json.dumps(input_data), b''
@@ -0,0 +1,148 @@
+"""
+In-process ABO/Rh compatibility rules.
+
+Mirrors COMPATIBILITY_MATRIX in cpp/blood_calculator.cpp so that
+compatibility checks no longer need a round trip to the calculator.
+Every (donor, recipient) answer is precomputed once at import time.
+"""
+
+# Blood group codes follow the order of Donor.BLOOD_GROUPS
+BLOOD_GROUPS = ('A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-')
+BLOOD_GROUP_CODES = {group: code for code, group in enumerate(BLOOD_GROUPS)}
+INVALID_CODE = -1
+
+# Recipient group -> (donor groups it can receive from, description,
+# is universal donor, is universal recipient)
+RECIPIENT_RULES = {
+    'A+': (('A+', 'A-', 'O+', 'O-'), 'Can receive from A+, A-, O+, O-', False, False),
+    'A-': (('A-', 'O-'), 'Can receive from A- and O-', False, False),
+    'B+': (('B+', 'B-', 'O+', 'O-'), 'Can receive from B+, B-, O+, O-', False, False),
+    'B-': (('B-', 'O-'), 'Can receive from B- and O-', False, False),
+    'AB+': (BLOOD_GROUPS, 'Can receive from all blood types', False, True),
+    'AB-': (('A-', 'B-', 'AB-', 'O-'), 'Can receive from A-, B-, AB-, O-', False, False),
+    'O+': (('O+', 'O-'), 'Can receive from O+ and O-', False, False),
+    'O-': (('O-',), 'Can receive from O- only', True, False),
+}
+
+INVALID_GROUP_RESULT = {'error': 'Invalid blood group'}
+
+
+def _build_matrix():
+    size = len(BLOOD_GROUPS)
+    compatible = [False] * (size * size)
+    results = [None] * (size * size)
+
+    for recipient, (donors, description, _, is_universal_recipient) in RECIPIENT_RULES.items():
+        r = BLOOD_GROUP_CODES[recipient]
+        for donor in BLOOD_GROUPS:
+            d = BLOOD_GROUP_CODES[donor]
+            is_compatible = donor in donors
+            compatible[d * size + r] = is_compatible
+            results[d * size + r] = {
+                'compatible': is_compatible,
+                'description': description,
+                'isUniversalDonor': RECIPIENT_RULES[donor][2],
+                'isUniversalRecipient': is_universal_recipient,
+            }
+
+    return tuple(compatible), tuple(results)
+
+
+# Flat row-major 8x8 matrices indexed by donor_code * 8 + recipient_code
+COMPATIBILITY_MATRIX, COMPATIBILITY_RESULTS = _build_matrix()
+
+# Precomputed compatible groups in each direction
+DONOR_GROUPS_FOR = {
+    recipient: tuple(g for g in BLOOD_GROUPS if COMPATIBILITY_MATRIX[BLOOD_GROUP_CODES[g] * 8 + BLOOD_GROUP_CODES[recipient]])
+    for recipient in BLOOD_GROUPS
+}
+RECIPIENT_GROUPS_FOR = {
+    donor: tuple(g for g in BLOOD_GROUPS if COMPATIBILITY_MATRIX[BLOOD_GROUP_CODES[donor] * 8 + BLOOD_GROUP_CODES[g]])
+    for donor in BLOOD_GROUPS
+}
+
+
+def encode_blood_group(blood_group):
+    """Return the integer code for a blood group, or INVALID_CODE."""
+    return BLOOD_GROUP_CODES.get(blood_group, INVALID_CODE)
+
+
+def encode_blood_groups(blood_groups):
+    """Return the integer codes for a sequence of blood groups."""
+    return [BLOOD_GROUP_CODES.get(group, INVALID_CODE) for group in blood_groups]
+
+
+def check_compatibility(donor_blood_group, recipient_blood_group):
+    """
+    Check if two blood groups are compatible.
+
+    Returns the same payload as the calculator's check_compatibility
+    operation, including the error payload for unknown groups.
+
+    Args:
+        donor_blood_group (str): Donor's blood group (e.g., "A+", "B-")
+        recipient_blood_group (str): Recipient's blood group
+
+    Returns:
+        dict: compatible, description, isUniversalDonor and
+            isUniversalRecipient, or an error message
+    """
+    d = BLOOD_GROUP_CODES.get(donor_blood_group)
+    r = BLOOD_GROUP_CODES.get(recipient_blood_group)
+    if d is None or r is None:
+        return dict(INVALID_GROUP_RESULT)
+    return dict(COMPATIBILITY_RESULTS[d * 8 + r])
+
+
+def is_compatible(donor_blood_group, recipient_blood_group):
+    """Return True if the donor can give to the recipient, False otherwise."""
+    d = BLOOD_GROUP_CODES.get(donor_blood_group)
+    r = BLOOD_GROUP_CODES.get(recipient_blood_group)
+    if d is None or r is None:
+        return False
+    return COMPATIBILITY_MATRIX[d * 8 + r]
+
+
+def is_compatible_codes(donor_codes, recipient_codes):
+    """
+    Vector lookup over parallel sequences of blood group codes.
+
+    Args:
+        donor_codes (list): Donor blood group codes
+        recipient_codes (list): Recipient blood group codes, same length
+
+    Returns:
+        list: One bool per pair; pairs with an invalid code are False
+    """
+    if len(donor_codes) != len(recipient_codes):
+        raise ValueError("Donor and recipient code sequences must have the same length")
+
+    matrix = COMPATIBILITY_MATRIX
+    return [
+        0 <= d < 8 and 0 <= r < 8 and matrix[d * 8 + r]
+        for d, r in zip(donor_codes, recipient_codes)
+    ]
+
+
+def compatibility_grid(donor_codes, recipient_codes):
+    """
+    Cross-product lookup: one row per donor code, one column per recipient code.
+
+    Returns:
+        list: A list of lists of bools
+    """
+    matrix = COMPATIBILITY_MATRIX
+    return [
+        [0 <= d < 8 and 0 <= r < 8 and matrix[d * 8 + r] for r in recipient_codes]
+        for d in donor_codes
+    ]
+
+
+def compatible_donor_groups(recipient_blood_group):
+    """Return the donor groups a recipient can receive from."""
+    return DONOR_GROUPS_FOR.get(recipient_blood_group, ())
+
+
+def compatible_recipient_groups(donor_blood_group):
+    """Return the recipient groups a donor can give to."""
+    return RECIPIENT_GROUPS_FOR.get(donor_blood_group, ())
@@ -0,0 +1,113 @@
+"""
+Cache and conditional-GET support for the blood bank directory.
+
+Every cached entry is keyed under a directory version token that the
+BloodBank save/delete signals replace, so a single write invalidates
+all cached pages, stamps and validators at once. Deleting a bank leaves
+no updated_at behind, so the delete signal also records the time of the
+last deletion, which the list's Last-Modified includes.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import BloodBank
+
+VERSION_KEY = 'bloodbank-directory:version'
+DELETED_KEY = 'bloodbank-directory:deleted-at'
+
+
+def directory_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, str(time.time_ns()), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_directory():
+    cache.set(VERSION_KEY, str(time.time_ns()), None)
+
+
+def last_deletion():
+    """
+    When a bank was last deleted. Without a record (a cold or evicted
+    cache) it starts at the current time, so a lost record can only
+    cause a refetch, never a stale 304.
+    """
+    deleted_at = cache.get(DELETED_KEY)
+    if deleted_at is None:
+        cache.add(DELETED_KEY, timezone.now(), None)
+        deleted_at = cache.get(DELETED_KEY)
+    return deleted_at
+
+
+def record_deletion():
+    cache.set(DELETED_KEY, timezone.now(), None)
+
+
+def directory_cache_key(*parts):
+    return ':'.join(['bloodbank-directory', directory_version(), *map(str, parts)])
+
+
+def _cached(key, compute):
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, getattr(settings, 'BLOOD_BANK_CACHE_TIMEOUT', 300))
+    return value
+
+
+def directory_stamp():
+    """
+    Return the last change to the whole directory (the latest updated_at
+    or deletion) and its row count.
+    """
+    stamp = _cached(
+        directory_cache_key('stamp'),
+        lambda: BloodBank.objects.aggregate(last_modified=Max('updated_at'), count=Count('id'))
+    )
+    changes = [stamp['last_modified'], last_deletion()]
+    return {**stamp, 'last_modified': max(change for change in changes if change is not None)}
+
+
+def bank_last_modified(pk):
+    """Return a single bank's updated_at, or None if it does not exist."""
+    def compute():
+        # Cache misses as False so unknown IDs do not hit the DB every time
+        updated_at = BloodBank.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        return updated_at or False
+
+    try:
+        return _cached(directory_cache_key('bank', int(pk), 'updated'), compute) or None
+    except (TypeError, ValueError):
+        return None
+
+
+def _etag(*parts):
+    return hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+# Validator callbacks for django.views.decorators.http.condition; they
+# receive the viewset's request and URL kwargs.
+
+def list_etag(request, *args, **kwargs):
+    stamp = directory_stamp()
+    return _etag(stamp['last_modified'], stamp['count'], request.get_full_path())
+
+
+def list_last_modified(request, *args, **kwargs):
+    return directory_stamp()['last_modified']
+
+
+def detail_etag(request, pk=None, *args, **kwargs):
+    last_modified = bank_last_modified(pk)
+    return _etag(pk, last_modified) if last_modified else None
+
+
+def detail_last_modified(request, pk=None, *args, **kwargs):
+    return bank_last_modified(pk)
@@ -0,0 +1,250 @@
+"""
+Columnar snapshot of Donation and DonationLog rows for analytics.
+
+Each dataset is held as parallel NumPy arrays (int8 blood group codes,
+int32 bank IDs, int32 units, int8 status/log type codes and datetime64
+dates) so group-by rollups are a few vectorized reductions instead of an
+ORM scan per chart. New rows are appended by primary key high-water
+mark; updates and deletes made through model instances in this process
+mark the snapshot stale via api.signals and the next refresh reloads it.
+The high-water mark cannot see rows committed out of primary key order,
+queryset update()s or writes from other processes, so the snapshot is
+also reloaded in full once it is DONATION_SNAPSHOT_MAX_AGE seconds old.
+Dates are bucketed in UTC.
+"""
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .compatibility import BLOOD_GROUP_CODES, BLOOD_GROUPS, INVALID_CODE
+from .models import Donation, DonationLog
+
+# dataset -> (model, date field, kind field, kind choices)
+SNAPSHOT_DATASETS = {
+    'donations': (Donation, 'donation_date', 'status', Donation.STATUS_CHOICES),
+    'logs': (DonationLog, 'log_date', 'log_type', DonationLog.LOG_TYPE_CHOICES),
+}
+
+# Rollup dimension -> datetime64 unit, for the date dimensions
+DATE_DIMENSIONS = {'day': 'D', 'month': 'M', 'year': 'Y'}
+ROLLUP_DIMENSIONS = ('blood_group', 'blood_bank', 'kind', *DATE_DIMENSIONS)
+
+# Rollups whose dimensions span at most this many cells are counted on a
+# dense grid; sparser ones fall back to np.unique
+DENSE_ROLLUP_CELLS = 1 << 22
+
+
+class DonationSnapshot:
+    """Append-only column store for one SNAPSHOT_DATASETS entry."""
+
+    def __init__(self, dataset):
+        self.model, self.date_field, self.kind_field, choices = SNAPSHOT_DATASETS[dataset]
+        self.kinds = tuple(value for value, _ in choices)
+        self._kind_codes = {value: code for code, value in enumerate(self.kinds)}
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self.high_water_mark = 0
+        self.stale = False
+        self.refreshed_at = 0.0
+        self.loaded_at = time.monotonic()
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.groups = np.zeros(0, dtype=np.int8)
+        self.banks = np.zeros(0, dtype=np.int32)
+        self.units = np.zeros(0, dtype=np.int32)
+        self.kind_codes = np.zeros(0, dtype=np.int8)
+        self.dates = np.zeros(0, dtype='datetime64[s]')
+        # datetime64 unit -> dates truncated to that unit, as int64 offsets
+        # from the epoch; calendar conversion is the slowest step of a
+        # rollup, so buckets are computed once and extended on refresh
+        self._buckets = {}
+
+    def _date_buckets(self, unit):
+        buckets = self._buckets.get(unit)
+        if buckets is None or len(buckets) < len(self.dates):
+            done = 0 if buckets is None else len(buckets)
+            fresh = self.dates[done:].astype(f'datetime64[{unit}]').view(np.int64)
+            buckets = fresh if buckets is None else np.concatenate([buckets, fresh])
+            self._buckets[unit] = buckets
+        return buckets
+
+    def __len__(self):
+        return len(self.ids)
+
+    def mark_stale(self):
+        """Force a full reload on the next refresh."""
+        self.stale = True
+
+    def refresh(self, chunk_size=10000, max_age=None):
+        """
+        Append rows created since the last refresh, or reload everything
+        if the snapshot was marked stale or was loaded over ``max_age``
+        seconds ago.
+
+        Returns:
+            int: The number of rows read from the database
+        """
+        with self._lock:
+            if self.stale or (max_age is not None and time.monotonic() - self.loaded_at > max_age):
+                self._clear()
+
+            rows = (
+                self.model.objects.filter(pk__gt=self.high_water_mark)
+                .order_by('pk')
+                .values_list('pk', 'blood_group', 'blood_bank_id', 'units', self.kind_field, self.date_field)
+                .iterator(chunk_size=chunk_size)
+            )
+            ids, groups, banks, units, kinds, dates = [], [], [], [], [], []
+            for pk, blood_group, bank_id, unit_count, kind, date in rows:
+                ids.append(pk)
+                groups.append(BLOOD_GROUP_CODES.get(blood_group, INVALID_CODE))
+                banks.append(bank_id)
+                units.append(unit_count)
+                kinds.append(self._kind_codes.get(kind, INVALID_CODE))
+                dates.append(int(date.timestamp()))
+
+            if ids:
+                self.ids = np.concatenate([self.ids, np.array(ids, dtype=np.int64)])
+                self.groups = np.concatenate([self.groups, np.array(groups, dtype=np.int8)])
+                self.banks = np.concatenate([self.banks, np.array(banks, dtype=np.int32)])
+                self.units = np.concatenate([self.units, np.array(units, dtype=np.int32)])
+                self.kind_codes = np.concatenate([self.kind_codes, np.array(kinds, dtype=np.int8)])
+                self.dates = np.concatenate([
+                    self.dates, np.array(dates, dtype=np.int64).astype('datetime64[s]')
+                ])
+                self.high_water_mark = ids[-1]
+            self.refreshed_at = time.monotonic()
+            return len(ids)
+
+    def _mask(self, kinds=None, blood_bank=None, start=None, end=None):
+        mask = np.ones(len(self.ids), dtype=bool)
+        if kinds:
+            codes = [self._kind_codes[kind] for kind in kinds if kind in self._kind_codes]
+            mask &= np.isin(self.kind_codes, codes)
+        if blood_bank is not None:
+            mask &= self.banks == blood_bank
+        if start is not None:
+            mask &= self.dates >= np.datetime64(int(start.timestamp()), 's')
+        if end is not None:
+            mask &= self.dates <= np.datetime64(int(end.timestamp()), 's')
+        return mask
+
+    @staticmethod
+    def _label(low, unit):
+        if unit is None:
+            return lambda code: low + code
+        return lambda code: str(np.datetime64(low + code, unit))
+
+    def rollup(self, by=('blood_group',), kinds=None, blood_bank=None, start=None, end=None):
+        """
+        Sum units and count rows grouped by any mix of ROLLUP_DIMENSIONS.
+
+        Args:
+            by (tuple): Dimensions to group on, in output order
+            kinds (list, optional): Only these statuses (donations) or log types (logs)
+            blood_bank (int, optional): Only rows for this blood bank
+            start (datetime, optional): Only rows on or after this moment
+            end (datetime, optional): Only rows on or before this moment
+
+        Returns:
+            list: One dict per non-empty cell with the dimension values,
+                ``units`` and ``count``
+        """
+        unknown = set(by) - set(ROLLUP_DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown rollup dimensions: {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            mask = self._mask(kinds, blood_bank, start, end)
+            mask &= self.groups != INVALID_CODE
+
+            # Give every dimension dense integer codes, offset from its
+            # smallest value, plus a function mapping codes back to labels
+            codes, labels = [], []
+            for dimension in by:
+                if dimension == 'blood_group':
+                    codes.append(self.groups[mask].astype(np.int64))
+                    labels.append((len(BLOOD_GROUPS), BLOOD_GROUPS.__getitem__))
+                elif dimension == 'kind':
+                    kind_codes = self.kind_codes[mask].astype(np.int64)
+                    kind_codes[kind_codes < 0] = len(self.kinds)
+                    codes.append(kind_codes)
+                    kind_labels = (*self.kinds, None)
+                    labels.append((len(kind_labels), kind_labels.__getitem__))
+                else:
+                    if dimension == 'blood_bank':
+                        values = self.banks[mask].astype(np.int64)
+                        unit = None
+                    else:
+                        unit = DATE_DIMENSIONS[dimension]
+                        values = self._date_buckets(unit)[mask]
+                    low = int(values.min()) if len(values) else 0
+                    high = int(values.max()) if len(values) else 0
+                    codes.append(values - low)
+                    labels.append((high - low + 1, self._label(low, unit)))
+            units = self.units[mask]
+
+        if not by:
+            return [{'units': int(units.sum()), 'count': int(len(units))}]
+        if not len(units):
+            return []
+
+        shape = tuple(size for size, _ in labels)
+        cells = codes[0]
+        for dimension_codes, dimension_size in zip(codes[1:], shape[1:]):
+            cells = cells * dimension_size + dimension_codes
+        size = np.prod(shape, dtype=np.float64)
+        if size <= DENSE_ROLLUP_CELLS:
+            # Dense grid: one bincount per measure, then keep non-empty cells
+            counts = np.bincount(cells, minlength=int(size))
+            occupied = np.flatnonzero(counts)
+            counts = counts[occupied]
+            unit_sums = np.bincount(cells, weights=units, minlength=int(size))[occupied].astype(np.int64)
+        else:
+            occupied, inverse = np.unique(cells, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(occupied))
+            unit_sums = np.zeros(len(occupied), dtype=np.int64)
+            np.add.at(unit_sums, inverse, units)
+
+        results = []
+        for cell, unit_sum, count in zip(zip(*np.unravel_index(occupied, shape)), unit_sums, counts):
+            row = {dimension: labels[i][1](int(index)) for i, (dimension, index) in enumerate(zip(by, cell))}
+            row['units'] = int(unit_sum)
+            row['count'] = int(count)
+            results.append(row)
+        return results
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_donation_snapshot(dataset):
+    """
+    Return the process-wide snapshot for a dataset, refreshed at most once
+    per DONATION_SNAPSHOT_REFRESH_INTERVAL seconds (and always when stale)
+    and reloaded in full every DONATION_SNAPSHOT_MAX_AGE seconds.
+    """
+    snapshot = _snapshots.get(dataset)
+    if snapshot is None:
+        with _snapshots_lock:
+            snapshot = _snapshots.get(dataset)
+            if snapshot is None:
+                snapshot = DonationSnapshot(dataset)
+                snapshot.refresh()
+                _snapshots[dataset] = snapshot
+
+    interval = getattr(settings, 'DONATION_SNAPSHOT_REFRESH_INTERVAL', 5)
+    max_age = getattr(settings, 'DONATION_SNAPSHOT_MAX_AGE', 300)
+    now = time.monotonic()
+    if snapshot.stale or now - snapshot.refreshed_at > interval or now - snapshot.loaded_at > max_age:
+        snapshot.refresh(max_age=max_age)
+    return snapshot
+
+
+def loaded_donation_snapshot(dataset):
+    """Return a dataset's snapshot if it has been loaded, else None."""
+    return _snapshots.get(dataset)
@@ -0,0 +1,202 @@
+"""
+In-memory donor locator for proximity queries.
+
+Holds donor coordinates, IDs, blood group codes and availability in
+NumPy arrays and answers radius and k-nearest queries with a vectorized
+Haversine, without touching the database. Enabled with
+``DONOR_NEARBY_BACKEND = 'memory'`` and kept current by the Location and
+Donor signals in api.signals.
+"""
+import math
+import threading
+
+import numpy as np
+
+from .compatibility import BLOOD_GROUP_CODES, INVALID_CODE
+from .geo import EARTH_RADIUS_KM, bounding_box
+
+
+class DonorLocator:
+    """
+    Column store of donor positions.
+
+    Rows are kept dense: removing a donor moves the last row into its
+    slot, so every query is a single vectorized pass over live rows.
+    """
+
+    def __init__(self, capacity=1024):
+        self._lock = threading.RLock()
+        self._index = {}
+        self._size = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old_size = self._size
+        columns = {
+            'ids': np.zeros(capacity, dtype=np.int64),
+            'lat': np.zeros(capacity, dtype=np.float64),
+            'lon': np.zeros(capacity, dtype=np.float64),
+            'groups': np.full(capacity, INVALID_CODE, dtype=np.int8),
+            'available': np.zeros(capacity, dtype=bool),
+        }
+        for name, column in columns.items():
+            if old_size:
+                column[:old_size] = getattr(self, name)[:old_size]
+            setattr(self, name, column)
+
+    def __len__(self):
+        return self._size
+
+    def load(self, rows):
+        """
+        Replace the index contents.
+
+        Args:
+            rows (iterable): (donor_id, latitude, longitude, blood_group, is_available)
+        """
+        ids, lat, lon, groups, available = [], [], [], [], []
+        for donor_id, latitude, longitude, blood_group, is_available in rows:
+            ids.append(donor_id)
+            lat.append(float(latitude))
+            lon.append(float(longitude))
+            groups.append(BLOOD_GROUP_CODES.get(blood_group, INVALID_CODE))
+            available.append(bool(is_available))
+
+        with self._lock:
+            self._size = 0
+            self._allocate(max(len(ids), 1024))
+            size = len(ids)
+            self.ids[:size] = ids
+            self.lat[:size] = np.radians(lat)
+            self.lon[:size] = np.radians(lon)
+            self.groups[:size] = groups
+            self.available[:size] = available
+            self._index = {donor_id: slot for slot, donor_id in enumerate(ids)}
+            self._size = size
+
+    def upsert(self, donor_id, latitude, longitude, blood_group, is_available):
+        with self._lock:
+            slot = self._index.get(donor_id)
+            if slot is None:
+                if self._size == len(self.ids):
+                    self._allocate(max(2 * len(self.ids), 1024))
+                slot = self._size
+                self._index[donor_id] = slot
+                self._size += 1
+
+            self.ids[slot] = donor_id
+            self.lat[slot] = math.radians(float(latitude))
+            self.lon[slot] = math.radians(float(longitude))
+            self.groups[slot] = BLOOD_GROUP_CODES.get(blood_group, INVALID_CODE)
+            self.available[slot] = bool(is_available)
+
+    def update_donor(self, donor_id, blood_group, is_available):
+        """Update the donor attributes of an indexed donor, if present."""
+        with self._lock:
+            slot = self._index.get(donor_id)
+            if slot is not None:
+                self.groups[slot] = BLOOD_GROUP_CODES.get(blood_group, INVALID_CODE)
+                self.available[slot] = bool(is_available)
+
+    def remove(self, donor_id):
+        with self._lock:
+            slot = self._index.pop(donor_id, None)
+            if slot is None:
+                return
+
+            last = self._size - 1
+            if slot != last:
+                for column in (self.ids, self.lat, self.lon, self.groups, self.available):
+                    column[slot] = column[last]
+                self._index[int(self.ids[slot])] = slot
+            self._size = last
+
+    def _candidates(self, latitude, longitude, radius_km, blood_groups, is_available):
+        size = self._size
+        lat = self.lat[:size]
+        lon = self.lon[:size]
+        mask = np.ones(size, dtype=bool)
+
+        if radius_km is not None:
+            min_lat, max_lat, lon_ranges = bounding_box(latitude, longitude, radius_km)
+            mask &= (lat >= math.radians(min_lat)) & (lat <= math.radians(max_lat))
+            in_lon = np.zeros(size, dtype=bool)
+            for min_lon, max_lon in lon_ranges:
+                in_lon |= (lon >= math.radians(min_lon)) & (lon <= math.radians(max_lon))
+            mask &= in_lon
+
+        if blood_groups:
+            codes = [BLOOD_GROUP_CODES.get(group, INVALID_CODE) for group in blood_groups]
+            mask &= np.isin(self.groups[:size], codes)
+
+        if is_available is not None:
+            mask &= self.available[:size] == bool(is_available)
+
+        return np.flatnonzero(mask)
+
+    def _distances(self, rows, latitude, longitude):
+        lat1 = math.radians(latitude)
+        lon1 = math.radians(longitude)
+        lat2 = self.lat[rows]
+        lon2 = self.lon[rows]
+        a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    def within_radius(self, latitude, longitude, radius_km, blood_groups=None, is_available=None, limit=None):
+        """
+        Return (donor_id, distance_km) pairs within the radius, nearest first.
+        """
+        with self._lock:
+            rows = self._candidates(latitude, longitude, radius_km, blood_groups, is_available)
+            distances = self._distances(rows, latitude, longitude)
+            keep = distances <= radius_km
+            rows, distances = rows[keep], distances[keep]
+            ids = self.ids[rows]
+
+        order = self._nearest_first(distances, limit)
+        return list(zip(ids[order].tolist(), distances[order].tolist()))
+
+    def nearest(self, latitude, longitude, k, blood_groups=None, is_available=None):
+        """
+        Return the k nearest (donor_id, distance_km) pairs, nearest first.
+        """
+        with self._lock:
+            rows = self._candidates(latitude, longitude, None, blood_groups, is_available)
+            distances = self._distances(rows, latitude, longitude)
+            ids = self.ids[rows]
+
+        order = self._nearest_first(distances, k)
+        return list(zip(ids[order].tolist(), distances[order].tolist()))
+
+    @staticmethod
+    def _nearest_first(distances, limit):
+        if limit is not None and limit < len(distances):
+            # Partial selection, then sort only the survivors
+            top = np.argpartition(distances, limit - 1)[:limit]
+            return top[np.argsort(distances[top], kind='stable')]
+        return np.argsort(distances, kind='stable')
+
+
+_locator = None
+_locator_lock = threading.Lock()
+
+
+def get_donor_locator():
+    """Return the process-wide donor locator, loading it on first use."""
+    global _locator
+    if _locator is None:
+        with _locator_lock:
+            if _locator is None:
+                from .models import Location
+
+                locator = DonorLocator()
+                locator.load(Location.objects.values_list(
+                    'donor_id', 'latitude', 'longitude', 'donor__blood_group', 'donor__is_available'
+                ).iterator(chunk_size=10000))
+                _locator = locator
+    return _locator
+
+
+def loaded_donor_locator():
+    """Return the donor locator if it has been loaded, else None."""
+    return _locator
@@ -0,0 +1,61 @@
+"""
+Donor eligibility backed by the stored Donor.next_eligible_date.
+
+Donor.save() keeps the date current for single-row writes; the helpers
+here recompute it in bulk after the deferral rule changes and build the
+indexed "who can give on this day" query.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Donor
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def eligible_donors(blood_groups=None, on=None):
+    """
+    Available donors whose deferral has ended by ``on`` (default: today).
+
+    Served by the (blood_group, next_eligible_date, is_available) index.
+    """
+    donors = Donor.objects.filter(
+        next_eligible_date__lte=on or timezone.localdate(),
+        is_available=True
+    )
+    if blood_groups:
+        donors = donors.filter(blood_group__in=blood_groups)
+    return donors
+
+
+def recompute_next_eligible_dates(chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Recompute next_eligible_date for every donor, one transaction per
+    primary key chunk, writing only rows whose date changed.
+
+    Returns:
+        tuple: (donors checked, donors updated)
+    """
+    checked = updated = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            donors = list(
+                Donor.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'last_donation', 'created_at', 'next_eligible_date')[:chunk_size]
+            )
+            if not donors:
+                return checked, updated
+
+            changed = []
+            for donor in donors:
+                next_date = donor.compute_next_eligible_date()
+                if donor.next_eligible_date != next_date:
+                    donor.next_eligible_date = next_date
+                    changed.append(donor)
+            Donor.objects.bulk_update(changed, ['next_eligible_date'])
+
+        checked += len(donors)
+        updated += len(changed)
+        last_pk = donors[-1].pk
@@ -0,0 +1,194 @@
+"""
+Demand forecasting over the DonationLog 'in' and 'out' series.
+
+Every (blood bank, blood group) pair is one row of a NumPy matrix, so
+each model update is a handful of array operations over all series at
+once; only the walk over days is a Python loop. Two models are kept:
+
+* a moving average of the last MOVING_AVERAGE_DAYS days, and
+* additive exponential smoothing with a weekly (day-of-week) seasonal
+  term, which is what projections use.
+
+Only complete days are fitted. The forecaster remembers the last fitted
+day and on refresh folds in just the days completed since, so keeping
+forecasts for every bank current is one small aggregate query per day.
+"""
+import threading
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DonationLog
+
+# Days of history fitted when the forecaster starts cold
+HISTORY_DAYS = 84
+MOVING_AVERAGE_DAYS = 28
+# Smoothing weights for the level and the day-of-week terms
+LEVEL_ALPHA = 0.3
+SEASON_GAMMA = 0.1
+
+# Row order of the first axis of every state array
+SERIES_TYPES = ('in', 'out')
+
+
+class DemandForecaster:
+    """Incrementally fitted forecasts for every bank and blood group."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.keys = []
+        self._index = {}
+        self.last_day = None
+        self.level = np.zeros((2, 0))
+        self.season = np.zeros((2, 0, 7))
+        self.recent = np.zeros((2, 0, MOVING_AVERAGE_DAYS))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _add_series(self, keys):
+        new = [key for key in keys if key not in self._index]
+        for key in new:
+            self._index[key] = len(self.keys)
+            self.keys.append(key)
+        if new:
+            count = len(new)
+            self.level = np.concatenate([self.level, np.zeros((2, count))], axis=1)
+            self.season = np.concatenate([self.season, np.zeros((2, count, 7))], axis=1)
+            self.recent = np.concatenate([self.recent, np.zeros((2, count, MOVING_AVERAGE_DAYS))], axis=1)
+        return len(new)
+
+    def refresh(self, today=None):
+        """
+        Fit every day completed since the last refresh.
+
+        Returns:
+            int: The number of days fitted
+        """
+        today = today or timezone.localdate()
+        with self._lock:
+            first_day = (self.last_day + timedelta(days=1)) if self.last_day else today - timedelta(days=HISTORY_DAYS)
+            days = (today - first_day).days
+            if days <= 0:
+                return 0
+
+            totals = (
+                DonationLog.objects.filter(log_date__date__gte=first_day, log_date__date__lt=today)
+                .order_by()
+                .annotate(day=TruncDate('log_date'))
+                .values_list('day', 'blood_bank_id', 'blood_group', 'log_type')
+                .annotate(total=Sum('units'))
+            )
+            rows = [row for row in totals if row[3] in SERIES_TYPES]
+
+            first_size = len(self.keys)
+            self._add_series(sorted({(bank_id, group) for _, bank_id, group, _, _ in rows}))
+
+            observed = np.zeros((2, len(self.keys), days))
+            if rows:
+                types, series, offsets, units = zip(*(
+                    (SERIES_TYPES.index(log_type), self._index[(bank_id, group)], (day - first_day).days, total)
+                    for day, bank_id, group, log_type, total in rows
+                ))
+                np.add.at(observed, (list(types), list(series), list(offsets)), units)
+
+            if first_size < len(self.keys):
+                # Start new series at their mean instead of at zero
+                self.level[:, first_size:] = observed[:, first_size:].mean(axis=2)
+
+            for offset in range(days):
+                weekday = (first_day + timedelta(days=offset)).weekday()
+                self._step(observed[:, :, offset], weekday)
+
+            self.last_day = today - timedelta(days=1)
+            return days
+
+    def _step(self, values, weekday):
+        season = self.season[:, :, weekday]
+        self.level = LEVEL_ALPHA * (values - season) + (1 - LEVEL_ALPHA) * self.level
+        self.season[:, :, weekday] = SEASON_GAMMA * (values - self.level) + (1 - SEASON_GAMMA) * season
+        self.recent = np.roll(self.recent, -1, axis=2)
+        self.recent[:, :, -1] = values
+
+    def forecast(self, horizon):
+        """
+        Project daily units for the ``horizon`` days after the last fit.
+
+        Returns:
+            ndarray: Shape (2, series, horizon), 'in' then 'out', never negative
+        """
+        with self._lock:
+            start = (self.last_day or timezone.localdate()) + timedelta(days=1)
+            weekdays = [(start + timedelta(days=offset)).weekday() for offset in range(horizon)]
+            return np.maximum(self.level[:, :, None] + self.season[:, :, weekdays], 0)
+
+    def moving_average(self):
+        """Mean daily units over the last MOVING_AVERAGE_DAYS, shape (2, series)."""
+        with self._lock:
+            return self.recent.mean(axis=2)
+
+    def series_for_bank(self, blood_bank_id):
+        return {group: self._index[(bank_id, group)] for bank_id, group in self.keys if bank_id == blood_bank_id}
+
+
+def days_of_supply(forecaster, blood_bank_id, stock, horizon=7):
+    """
+    Project how long each blood group's stock lasts at one bank.
+
+    Args:
+        forecaster (DemandForecaster): A refreshed forecaster
+        blood_bank_id (int): The bank to project
+        stock (dict): Current units keyed by blood group
+        horizon (int): Days to project
+
+    Returns:
+        list: One dict per blood group with stock, forecast daily demand and
+            supply, the moving average demand, days_of_supply (stock over
+            forecast demand) and the first projected stockout date, if any
+    """
+    series = forecaster.series_for_bank(blood_bank_id)
+    projected = forecaster.forecast(horizon)
+    moving_average = forecaster.moving_average()
+    start = (forecaster.last_day or timezone.localdate()) + timedelta(days=1)
+
+    results = []
+    for group in sorted(set(series) | set(stock)):
+        units = stock.get(group, 0)
+        if group in series:
+            supply, demand = projected[:, series[group]]
+            average_demand = float(moving_average[1, series[group]])
+        else:
+            supply = demand = np.zeros(horizon)
+            average_demand = 0.0
+
+        daily_demand = float(demand.mean())
+        balance = units + np.cumsum(supply - demand)
+        stockout = np.flatnonzero(balance <= 0)
+        results.append({
+            'blood_group': group,
+            'stock': units,
+            'daily_demand': round(daily_demand, 2),
+            'daily_supply': round(float(supply.mean()), 2),
+            'moving_average_demand': round(average_demand, 2),
+            'days_of_supply': round(units / daily_demand, 1) if daily_demand > 0 else None,
+            'stockout_date': start + timedelta(days=int(stockout[0])) if len(stockout) else None,
+        })
+    return results
+
+
+_forecaster = None
+_forecaster_lock = threading.Lock()
+
+
+def get_demand_forecaster():
+    """Return the process-wide forecaster, fitted up to yesterday."""
+    global _forecaster
+    if _forecaster is None:
+        with _forecaster_lock:
+            if _forecaster is None:
+                _forecaster = DemandForecaster()
+    _forecaster.refresh()
+    return _forecaster
@@ -0,0 +1,43 @@
+import math
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE_LATITUDE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return the latitude/longitude box that contains every point within
+    ``radius_km`` of the given point.
+
+    Returns:
+        tuple: (min_lat, max_lat, lon_ranges) where lon_ranges is a list of
+            one or two (min_lon, max_lon) pairs; two when the box crosses
+            the antimeridian
+    """
+    lat_delta = radius_km / KM_PER_DEGREE_LATITUDE
+    min_lat = max(latitude - lat_delta, -90.0)
+    max_lat = min(latitude + lat_delta, 90.0)
+
+    # Near the poles every longitude can be within the radius
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 1e-9:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+
+    lon_delta = radius_km / (KM_PER_DEGREE_LATITUDE * cos_lat)
+    if lon_delta >= 180:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+
+    min_lon = longitude - lon_delta
+    max_lon = longitude + lon_delta
+    if min_lon < -180:
+        return min_lat, max_lat, [(min_lon + 360, 180.0), (-180.0, max_lon)]
+    if max_lon > 180:
+        return min_lat, max_lat, [(min_lon, 180.0), (-180.0, max_lon - 360)]
+    return min_lat, max_lat, [(min_lon, max_lon)]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometers between two points in degrees."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .inventory import apply_logs
+from .models import BloodBank, Donation, DonationLog, Donor
+from .serializers import DonationIngestSerializer
+from .sqlite import write_transaction
+
+
+def ingest_donations(rows, chunk_size=None):
+    """
+    Validate and insert a batch of donations, with an 'in' log for each
+    completed one.
+
+    Invalid rows are reported and skipped; valid rows are written with
+    bulk_create in chunks inside a single transaction. Donors with a
+    completed row get today as their last donation, with
+    next_eligible_date recomputed, in one bulk_update.
+
+    Args:
+        rows (list): Donation dictionaries, see DonationIngestSerializer
+        chunk_size (int, optional): Rows per INSERT statement
+
+    Returns:
+        tuple: (number of donations created, list of per-row errors)
+    """
+    chunk_size = chunk_size or getattr(settings, 'BULK_INGEST_CHUNK_SIZE', 500)
+    errors = []
+    valid = []
+
+    for index, row in enumerate(rows):
+        serializer = DonationIngestSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+
+    # Check every referenced donor and blood bank with one query each
+    bank_ids = set(BloodBank.objects.filter(
+        id__in={data['blood_bank'] for _, data in valid}
+    ).values_list('id', flat=True))
+    donor_ids = set(User.objects.filter(
+        id__in={data['donor'] for _, data in valid}
+    ).values_list('id', flat=True))
+
+    donations = []
+    for index, data in valid:
+        row_errors = {}
+        if data['blood_bank'] not in bank_ids:
+            row_errors['blood_bank'] = ['Blood bank does not exist.']
+        if data['donor'] not in donor_ids:
+            row_errors['donor'] = ['Donor does not exist.']
+        if row_errors:
+            errors.append({'index': index, 'errors': row_errors})
+            continue
+
+        donations.append(Donation(
+            donor_id=data['donor'],
+            blood_bank_id=data['blood_bank'],
+            blood_group=data['blood_group'],
+            units=data['units'],
+            status=data['status'],
+            notes=data['notes']
+        ))
+
+    logs = [
+        DonationLog(
+            blood_bank_id=donation.blood_bank_id,
+            blood_group=donation.blood_group,
+            units=donation.units,
+            log_type='in'
+        )
+        for donation in donations
+        if donation.status == 'completed'
+    ]
+    donated = {donation.donor_id for donation in donations if donation.status == 'completed'}
+
+    with write_transaction():
+        Donation.objects.bulk_create(donations, batch_size=chunk_size)
+        DonationLog.objects.bulk_create(logs, batch_size=chunk_size)
+        # bulk_create skips the DonationLog signals
+        apply_logs(logs)
+        _record_donations(donated, chunk_size)
+
+    errors.sort(key=lambda error: error['index'])
+    return len(donations), errors
+
+
+def _record_donations(user_ids, chunk_size):
+    """Set last_donation to today for these users' donor profiles, as Donor.save() would."""
+    today = timezone.localdate()
+    now = timezone.now()
+    donors = list(
+        Donor.objects.filter(user_id__in=user_ids)
+        .only('pk', 'last_donation', 'created_at', 'next_eligible_date', 'updated_at')
+    )
+    for donor in donors:
+        donor.last_donation = today
+        donor.next_eligible_date = donor.compute_next_eligible_date()
+        donor.updated_at = now
+    Donor.objects.bulk_update(
+        donors, ['last_donation', 'next_eligible_date', 'updated_at'], batch_size=chunk_size
+    )
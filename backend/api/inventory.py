@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Sum, When
+
+from .models import DonationLog, Inventory
+
+
+def log_delta(log_type, units):
+    """Return the signed stock change for a DonationLog entry."""
+    return units if log_type == 'in' else -units
+
+
+def apply_inventory_delta(blood_bank_id, blood_group, delta, create=True):
+    """
+    Atomically add ``delta`` units to one inventory row.
+
+    The row is updated in place with an F() expression so concurrent
+    writers never lose an update. A missing row is created when
+    ``create`` is set.
+    """
+    if not delta:
+        return
+
+    rows = Inventory.objects.filter(blood_bank_id=blood_bank_id, blood_group=blood_group)
+    if rows.update(units=F('units') + delta) or not create:
+        return
+
+    try:
+        with transaction.atomic():
+            Inventory.objects.create(blood_bank_id=blood_bank_id, blood_group=blood_group, units=delta)
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(units=F('units') + delta)
+
+
+def apply_logs(logs):
+    """
+    Apply a batch of DonationLog entries to the inventory with one update
+    per (blood bank, blood group) instead of one per log.
+
+    Used by write paths that bypass model signals, such as bulk_create.
+    """
+    deltas = defaultdict(int)
+    for log in logs:
+        deltas[(log.blood_bank_id, log.blood_group)] += log_delta(log.log_type, log.units)
+
+    with transaction.atomic():
+        for (blood_bank_id, blood_group), delta in deltas.items():
+            apply_inventory_delta(blood_bank_id, blood_group, delta)
+
+
+def compute_inventory_from_logs():
+    """
+    Recompute every balance from the full DonationLog history.
+
+    Returns:
+        dict: Units keyed by (blood_bank_id, blood_group)
+    """
+    signed_units = Case(
+        When(log_type='in', then=F('units')),
+        default=-F('units'),
+        output_field=IntegerField()
+    )
+    totals = (
+        DonationLog.objects.order_by()
+        .values('blood_bank_id', 'blood_group')
+        .annotate(balance=Sum(signed_units))
+        .values_list('blood_bank_id', 'blood_group', 'balance')
+    )
+    return {(bank_id, group): balance or 0 for bank_id, group, balance in totals}
+
+
+def verify_inventory():
+    """
+    Compare the inventory table with the log history.
+
+    Returns:
+        list: (blood_bank_id, blood_group, stored, expected) for every
+            row that disagrees
+    """
+    expected = compute_inventory_from_logs()
+    stored = {
+        (bank_id, group): units
+        for bank_id, group, units in Inventory.objects.values_list('blood_bank_id', 'blood_group', 'units')
+    }
+
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys(), key=str):
+        if stored.get(key, 0) != expected.get(key, 0):
+            mismatches.append((*key, stored.get(key), expected.get(key, 0)))
+    return mismatches
+
+
+@transaction.atomic
+def rebuild_inventory():
+    """
+    Replace the inventory table with balances recomputed from the log.
+
+    Returns:
+        int: The number of inventory rows written
+    """
+    balances = compute_inventory_from_logs()
+    Inventory.objects.all().delete()
+    Inventory.objects.bulk_create([
+        Inventory(blood_bank_id=bank_id, blood_group=group, units=units)
+        for (bank_id, group), units in balances.items()
+    ])
+    return len(balances)
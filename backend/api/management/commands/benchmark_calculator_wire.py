@@ -0,0 +1,84 @@
+import json
+import random
+import time
+from array import array
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.calculator_pool import CALCULATOR_EXECUTABLE, CalculatorPool
+from api.calculator_wire import encode_request
+from api.compatibility import BLOOD_GROUPS
+
+
+class Command(BaseCommand):
+    help = 'Compare JSON and packed calculator requests for availability calculations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument(
+            '--round-trip',
+            action='store_true',
+            help='Also time full requests against the compiled blood_calculator binary',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['round_trip'] and not CALCULATOR_EXECUTABLE.exists():
+            raise CommandError(f'Blood calculator executable not found at {CALCULATOR_EXECUTABLE}')
+
+        rng = random.Random(options['seed'])
+        for size in options['sizes']:
+            request = {
+                'operation': 'calculate_availability',
+                'donations': [
+                    {
+                        'blood_group': rng.choice(BLOOD_GROUPS),
+                        'units': rng.randint(1, 3),
+                        'is_available': rng.random() < 0.8,
+                    }
+                    for _ in range(size)
+                ],
+            }
+
+            json_line, _ = encode_request(request)
+            packed_line, payload = encode_request(request, ('json', 'packed'))
+            json_encode_ms = self._time(options['repeat'], lambda: encode_request(request))
+            packed_encode_ms = self._time(options['repeat'], lambda: encode_request(request, ('json', 'packed')))
+            # Decode time in Python (json.loads vs array unpacking), not the
+            # binary's own parse cost
+            json_parse_ms = self._time(options['repeat'], lambda: json.loads(json_line))
+            packed_parse_ms = self._time(options['repeat'], lambda: self._unpack(payload, size))
+
+            self.stdout.write(
+                f'{size:>9} donations  json:   {len(json_line):>11} bytes, '
+                f'encode {json_encode_ms:9.1f} ms, python decode {json_parse_ms:9.1f} ms'
+            )
+            self.stdout.write(
+                f'{size:>9} donations  packed: {len(packed_line) + 1 + len(payload):>11} bytes, '
+                f'encode {packed_encode_ms:9.1f} ms, python unpack {packed_parse_ms:9.1f} ms'
+            )
+
+            if options['round_trip']:
+                for encoding in ('json', 'auto'):
+                    pool = CalculatorPool(size=1, max_queue=0, wire_encoding=encoding, packed_min_donations=0)
+                    try:
+                        pool.run({'operation': 'ping'})
+                        elapsed = self._time(options['repeat'], lambda: pool.run(request))
+                    finally:
+                        pool.shutdown()
+                    label = 'json' if encoding == 'json' else 'packed'
+                    self.stdout.write(f'{size:>9} donations  {label + ":":<7} round trip {elapsed:9.1f} ms')
+
+    def _unpack(self, payload, count):
+        codes = array('b', payload[:count])
+        flags = array('B', payload[count:2 * count])
+        units = array('i')
+        units.frombytes(payload[2 * count:])
+        return codes, flags, units
+
+    def _time(self, repeat, func):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) * 1000 / repeat
@@ -0,0 +1,100 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.compatibility import BLOOD_GROUPS
+from api.donor_locator import DonorLocator
+from api.models import Donor, Location
+from api.utils import nearby_donor_queryset
+
+# Synthetic donors are spread over roughly 4 x 4 degrees around this point
+CENTER = (15.3647, 75.1240)
+SPREAD_DEGREES = 2.0
+
+
+class Command(BaseCommand):
+    help = 'Compare nearby donor search on the in-memory locator and the ORM path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--radius', type=float, default=10.0)
+        parser.add_argument('--limit', type=int, default=50)
+        parser.add_argument(
+            '--orm',
+            action='store_true',
+            help='Also time the ORM path; inserts synthetic donors inside a rolled back transaction',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        queries = [self._random_point(rng) for _ in range(options['queries'])]
+
+        for size in options['sizes']:
+            rows = [
+                (donor_id, *self._random_point(rng), rng.choice(BLOOD_GROUPS), rng.random() < 0.8)
+                for donor_id in range(1, size + 1)
+            ]
+
+            started = time.perf_counter()
+            locator = DonorLocator()
+            locator.load(rows)
+            load_ms = (time.perf_counter() - started) * 1000
+
+            memory_ms = self._time(queries, lambda lat, lon: locator.within_radius(
+                lat, lon, options['radius'], limit=options['limit']
+            ))
+            self.stdout.write(
+                f'{size:>9} donors  memory: load {load_ms:9.1f} ms, {memory_ms:8.3f} ms/query'
+            )
+
+            if options['orm']:
+                orm_ms = self._time_orm(rows, queries, options)
+                self.stdout.write(f'{size:>9} donors  orm:                      {orm_ms:8.3f} ms/query')
+
+    def _random_point(self, rng):
+        return (
+            CENTER[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            CENTER[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+        )
+
+    def _time(self, queries, search):
+        started = time.perf_counter()
+        for lat, lon in queries:
+            search(lat, lon)
+        return (time.perf_counter() - started) * 1000 / len(queries)
+
+    def _time_orm(self, rows, queries, options):
+        with transaction.atomic():
+            prefix = f'bench-nearby-{time.time_ns()}'
+            users = User.objects.bulk_create(
+                [User(username=f'{prefix}-{donor_id}') for donor_id, *_ in rows],
+                batch_size=5000
+            )
+            donors = Donor.objects.bulk_create(
+                [
+                    Donor(user=user, blood_group=group, is_available=available, weight=60, height=170)
+                    for user, (_, _, _, group, available) in zip(users, rows)
+                ],
+                batch_size=5000
+            )
+            Location.objects.bulk_create(
+                [
+                    Location(
+                        donor=donor, latitude=round(lat, 6), longitude=round(lon, 6),
+                        address='', city='', state='', country='', postal_code=''
+                    )
+                    for donor, (_, lat, lon, _, _) in zip(donors, rows)
+                ],
+                batch_size=5000
+            )
+
+            elapsed = self._time(queries, lambda lat, lon: list(
+                nearby_donor_queryset(lat, lon, options['radius'])[:options['limit']].values_list('id', flat=True)
+            ))
+            transaction.set_rollback(True)
+        return elapsed
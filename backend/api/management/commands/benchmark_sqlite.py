@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.compatibility import BLOOD_GROUPS
+from api.sqlite import SQLITE_PROFILES, WriteLock, apply_pragmas
+
+BANKS = 50
+
+SCHEMA = (
+    'CREATE TABLE log (id INTEGER PRIMARY KEY, bank INTEGER, blood_group TEXT, units INTEGER, '
+    'log_type TEXT, logged_at TEXT)',
+    'CREATE INDEX log_bank ON log (bank, blood_group)',
+    'CREATE TABLE inventory (bank INTEGER, blood_group TEXT, units INTEGER, PRIMARY KEY (bank, blood_group))',
+)
+
+
+def _connect(path, pragmas):
+    # Autocommit with explicit BEGIN, the way Django drives SQLite
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    apply_pragmas(connection.cursor(), pragmas)
+    return connection
+
+
+def _run_writer(path, pragmas, lock_path, seconds, seed):
+    """Insert a log row and update its inventory row per transaction, like a donation entry."""
+    rng = random.Random(seed)
+    connection = _connect(path, pragmas)
+    lock = WriteLock(lock_path) if lock_path else None
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        bank, group, units = rng.randrange(BANKS), rng.choice(BLOOD_GROUPS), rng.randint(1, 3)
+        if lock:
+            lock.acquire()
+        try:
+            connection.execute('BEGIN')
+            connection.execute(
+                'SELECT units FROM inventory WHERE bank = ? AND blood_group = ?', (bank, group)
+            ).fetchone()
+            connection.execute(
+                "INSERT INTO log (bank, blood_group, units, log_type, logged_at) "
+                "VALUES (?, ?, ?, 'in', datetime('now'))",
+                (bank, group, units)
+            )
+            connection.execute(
+                'UPDATE inventory SET units = units + ? WHERE bank = ? AND blood_group = ?',
+                (units, bank, group)
+            )
+            connection.execute('COMMIT')
+            done += 1
+        except sqlite3.OperationalError:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            errors += 1
+        finally:
+            if lock:
+                lock.release()
+    connection.close()
+    return 'write', done, errors
+
+
+def _run_reader(path, pragmas, lock_path, seconds, seed):
+    """Sum one bank's log by blood group, like an availability read."""
+    rng = random.Random(seed)
+    connection = _connect(path, pragmas)
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            connection.execute(
+                'SELECT blood_group, SUM(units) FROM log WHERE bank = ? GROUP BY blood_group',
+                (rng.randrange(BANKS),)
+            ).fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    connection.close()
+    return 'read', done, errors
+
+
+def _run(role, *args):
+    return (_run_writer if role == 'write' else _run_reader)(*args)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure SQLite read/write throughput with concurrent writer and reader processes '
+        'under each pragma profile, with and without the application write lock'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--rows', type=int, default=100000, help='Log rows seeded before each run')
+        parser.add_argument('--profiles', nargs='+', default=list(SQLITE_PROFILES), choices=list(SQLITE_PROFILES))
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['writers'] < 0 or options['readers'] < 0 or options['writers'] + options['readers'] == 0:
+            raise CommandError('Need at least one writer or reader')
+
+        self.stdout.write(
+            f"{options['writers']} writer and {options['readers']} reader processes, "
+            f"{options['seconds']:g} s per run, {options['rows']} seeded log rows"
+        )
+        self.stdout.write(f"{'profile':<12} {'write lock':<11} {'writes/s':>10} {'reads/s':>10} {'locked errors':>14}")
+
+        for profile in options['profiles']:
+            for locked in (False, True):
+                writes, reads, errors = self._measure(SQLITE_PROFILES[profile], locked, options)
+                self.stdout.write(
+                    f"{profile:<12} {'on' if locked else 'off':<11} {writes:>10.0f} {reads:>10.0f} {errors:>14}"
+                )
+
+    def _measure(self, pragmas, locked, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'benchmark.sqlite3')
+            self._seed(path, pragmas, options)
+
+            lock_path = f'{path}-writelock' if locked else None
+            jobs = [
+                (role, path, pragmas, lock_path, options['seconds'], options['seed'] + i)
+                for i, role in enumerate(['write'] * options['writers'] + ['read'] * options['readers'])
+            ]
+            with multiprocessing.Pool(len(jobs)) as pool:
+                results = pool.starmap(_run, jobs)
+
+        seconds = options['seconds']
+        writes = sum(done for role, done, _ in results if role == 'write') / seconds
+        reads = sum(done for role, done, _ in results if role == 'read') / seconds
+        return writes, reads, sum(errors for _, _, errors in results)
+
+    def _seed(self, path, pragmas, options):
+        rng = random.Random(options['seed'])
+        connection = _connect(path, pragmas)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.execute('BEGIN')
+        connection.executemany(
+            'INSERT INTO inventory VALUES (?, ?, 0)',
+            [(bank, group) for bank in range(BANKS) for group in BLOOD_GROUPS]
+        )
+        connection.executemany(
+            "INSERT INTO log (bank, blood_group, units, log_type, logged_at) VALUES (?, ?, ?, 'in', datetime('now'))",
+            ((rng.randrange(BANKS), rng.choice(BLOOD_GROUPS), rng.randint(1, 3)) for _ in range(options['rows']))
+        )
+        connection.execute('COMMIT')
+        connection.close()
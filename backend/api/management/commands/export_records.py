@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import exports
+
+
+class Command(BaseCommand):
+    help = 'Stream donations, donation logs or donation history as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(exports.EXPORT_DATASETS))
+        parser.add_argument('--format', dest='export_format', choices=exports.EXPORT_FORMATS, default='ndjson')
+        parser.add_argument('--start', help='ISO date or datetime, inclusive')
+        parser.add_argument('--end', help='ISO date or datetime, inclusive')
+        parser.add_argument('--blood-bank', type=int, help='Only rows for this blood bank ID')
+        parser.add_argument('--chunk-size', type=int, help='Rows fetched per database round trip')
+        parser.add_argument('--output', help='File to write to; defaults to stdout')
+
+    def handle(self, *args, **options):
+        try:
+            start = exports.parse_boundary(options['start']) if options['start'] else None
+            end = exports.parse_boundary(options['end'], end=True) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        columns, rows = exports.export_rows(
+            options['dataset'],
+            start=start,
+            end=end,
+            blood_bank=options['blood_bank'],
+            chunk_size=options['chunk_size']
+        )
+        lines = exports.iter_export(options['export_format'], columns, rows)
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as out:
+                out.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
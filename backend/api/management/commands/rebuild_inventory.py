@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.inventory import rebuild_inventory, verify_inventory
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-bank inventory table from the full DonationLog history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only verify the inventory against the log; do not rewrite it',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            rows = rebuild_inventory()
+            self.stdout.write(f'Rebuilt {rows} inventory rows')
+
+        mismatches = verify_inventory()
+        for bank_id, group, stored, expected in mismatches:
+            self.stderr.write(f'Bank {bank_id} {group}: stored={stored} expected={expected}')
+
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} inventory rows disagree with the donation log')
+
+        self.stdout.write(self.style.SUCCESS('Inventory matches the donation log'))
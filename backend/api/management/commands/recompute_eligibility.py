@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.eligibility import DEFAULT_CHUNK_SIZE, recompute_next_eligible_dates
+
+
+class Command(BaseCommand):
+    help = 'Recompute Donor.next_eligible_date for every donor, e.g. after DONATION_DEFERRAL_DAYS changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        checked, updated = recompute_next_eligible_dates(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} donors, updated {updated}'))
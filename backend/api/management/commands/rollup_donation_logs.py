@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from api.rollups import DEFAULT_BATCH_SIZE, backfill_rollups, roll_up_logs
+
+
+class Command(BaseCommand):
+    help = 'Fold new DonationLog entries into the daily inventory rollup table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Rebuild rollups from the raw log instead of continuing from the checkpoint; '
+                 'use after logs were edited or deleted',
+        )
+        parser.add_argument('--since', help='With --backfill, only rebuild days from this ISO date on')
+
+    def handle(self, *args, **options):
+        if options['since'] and not options['backfill']:
+            raise CommandError('--since requires --backfill')
+
+        if options['backfill']:
+            since = None
+            if options['since']:
+                since = parse_date(options['since'])
+                if since is None:
+                    raise CommandError(f"Invalid date: {options['since']}")
+            rows = backfill_rollups(since=since)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} rollup rows'))
+            return
+
+        processed = roll_up_logs(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {processed} new donation logs'))
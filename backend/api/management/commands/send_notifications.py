@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from api.notifications import (
+    get_notification_backend,
+    notification_settings,
+    process_batch,
+    release_stale_claims,
+    worker_id,
+)
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued donor notifications; run several processes to send faster'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Rows claimed per batch (default: NOTIFICATIONS BATCH_SIZE)')
+        parser.add_argument('--backend', help='Dotted path of the delivery backend, overriding the setting')
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no notification is due instead of polling',
+        )
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        config = notification_settings()
+        if options['batch_size'] is not None:
+            if options['batch_size'] < 1:
+                raise CommandError('--batch-size must be positive')
+            config['BATCH_SIZE'] = options['batch_size']
+        if options['backend']:
+            try:
+                import_string(options['backend'])
+            except ImportError as e:
+                raise CommandError(f"Unknown backend: {options['backend']}") from e
+            config['BACKEND'] = options['backend']
+
+        backend = get_notification_backend(config)
+        worker = worker_id()
+        self.stderr.write(f'Worker {worker} using {config["BACKEND"]}')
+
+        totals = {'sent': 0, 'retried': 0, 'failed': 0, 'deferred': 0}
+        try:
+            while True:
+                release_stale_claims(config['LOCK_TIMEOUT'])
+                stats = process_batch(worker, backend=backend, options=config)
+                for key in totals:
+                    totals[key] += stats[key]
+                if stats['claimed']:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            'Sent {sent}, retrying {retried}, failed {failed}, rate limited {deferred}'.format(**totals)
+        ))
@@ -0,0 +1,142 @@
+"""
+Normalized vocabulary for Donor.medical_conditions.
+
+Donors enter conditions as free comma-separated text. Each entry is
+mapped onto a canonical condition name, and the set of names is stored
+as a bitmask in Donor.medical_conditions_mask so screening is a bitwise
+predicate in SQL instead of string parsing in Python. Entries that match
+nothing in the vocabulary set the ``other`` bit.
+
+Only append to MEDICAL_CONDITIONS: a name's position is its bit, so
+reordering would change the meaning of stored masks.
+"""
+import re
+
+from django.db.models import F
+
+MEDICAL_CONDITIONS = (
+    'other',
+    'anemia',
+    'asthma',
+    'bleeding_disorder',
+    'cancer',
+    'diabetes',
+    'epilepsy',
+    'heart_disease',
+    'hepatitis_b',
+    'hepatitis_c',
+    'hiv',
+    'hypertension',
+    'kidney_disease',
+    'malaria',
+    'pregnancy',
+    'recent_surgery',
+    'recent_tattoo',
+    'thyroid_disorder',
+    'tuberculosis',
+)
+
+CONDITION_BITS = {name: 1 << bit for bit, name in enumerate(MEDICAL_CONDITIONS)}
+
+# Common spellings, keyed by their normalized form
+CONDITION_ALIASES = {
+    'anaemia': 'anemia',
+    'low hemoglobin': 'anemia',
+    'low haemoglobin': 'anemia',
+    'haemophilia': 'bleeding_disorder',
+    'hemophilia': 'bleeding_disorder',
+    'diabetic': 'diabetes',
+    'diabetes mellitus': 'diabetes',
+    'sugar': 'diabetes',
+    'seizures': 'epilepsy',
+    'heart condition': 'heart_disease',
+    'cardiac disease': 'heart_disease',
+    'hep b': 'hepatitis_b',
+    'hepatitis b': 'hepatitis_b',
+    'hbv': 'hepatitis_b',
+    'hep c': 'hepatitis_c',
+    'hepatitis c': 'hepatitis_c',
+    'hcv': 'hepatitis_c',
+    'hiv/aids': 'hiv',
+    'aids': 'hiv',
+    'high blood pressure': 'hypertension',
+    'high bp': 'hypertension',
+    'bp': 'hypertension',
+    'kidney disease': 'kidney_disease',
+    'renal disease': 'kidney_disease',
+    'pregnant': 'pregnancy',
+    'surgery': 'recent_surgery',
+    'tattoo': 'recent_tattoo',
+    'piercing': 'recent_tattoo',
+    'thyroid': 'thyroid_disorder',
+    'hypothyroidism': 'thyroid_disorder',
+    'hyperthyroidism': 'thyroid_disorder',
+    'tb': 'tuberculosis',
+}
+
+
+def normalize_condition(text):
+    """
+    Map one free-text condition onto the vocabulary.
+
+    Returns:
+        str: The canonical name, 'other' if unrecognized, or None if blank
+    """
+    key = re.sub(r'\s+', ' ', text.strip().lower())
+    if not key:
+        return None
+    name = key.replace(' ', '_').replace('-', '_')
+    if name in CONDITION_BITS:
+        return name
+    return CONDITION_ALIASES.get(key.replace('-', ' '), 'other')
+
+
+def conditions_mask(text):
+    """Bitmask for a comma-separated medical_conditions value."""
+    mask = 0
+    for entry in (text or '').split(','):
+        name = normalize_condition(entry)
+        if name:
+            mask |= CONDITION_BITS[name]
+    return mask
+
+
+def mask_for(names):
+    """
+    Bitmask for canonical condition names.
+
+    Raises:
+        ValueError: If a name is not in MEDICAL_CONDITIONS
+    """
+    mask = 0
+    for name in names:
+        if name not in CONDITION_BITS:
+            raise ValueError(f"Unknown medical condition: {name}")
+        mask |= CONDITION_BITS[name]
+    return mask
+
+
+def conditions_from_mask(mask):
+    return [name for name, bit in CONDITION_BITS.items() if mask & bit]
+
+
+def exclude_conditions(queryset, value):
+    """
+    Drop donors with any of the comma-separated conditions in ``value``.
+
+    ``all`` keeps only donors with no conditions, an equality match on the
+    indexed mask column; anything else is a single bitwise AND.
+
+    Raises:
+        ValueError: If a name is not in MEDICAL_CONDITIONS
+    """
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if 'all' in names:
+        return queryset.filter(medical_conditions_mask=0)
+
+    mask = mask_for(names)
+    if not mask:
+        return queryset
+    return queryset.alias(
+        excluded_conditions=F('medical_conditions_mask').bitand(mask)
+    ).filter(excluded_conditions=0)
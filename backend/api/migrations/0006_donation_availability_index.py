@@ -0,0 +1,13 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0005_add_blood_group_to_donation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['blood_bank', 'status', 'blood_group'], name='api_donatio_blood_b_a1c262_idx'),
+        ),
+    ]
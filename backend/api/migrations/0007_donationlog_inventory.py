@@ -0,0 +1,55 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+def build_inventory(apps, schema_editor):
+    DonationLog = apps.get_model('api', 'DonationLog')
+    Inventory = apps.get_model('api', 'Inventory')
+
+    balances = {}
+    for log in DonationLog.objects.all().iterator():
+        key = (log.blood_bank_id, log.blood_group)
+        balances[key] = balances.get(key, 0) + (log.units if log.log_type == 'in' else -log.units)
+
+    Inventory.objects.bulk_create([
+        Inventory(blood_bank_id=bank_id, blood_group=group, units=units)
+        for (bank_id, group), units in balances.items()
+    ])
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0006_donation_availability_index'),
+    ]
+
+    operations = [
+        # DonationLog was added to models.py without a migration
+        migrations.CreateModel(
+            name='DonationLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('blood_group', models.CharField(max_length=5)),
+                ('units', models.PositiveIntegerField()),
+                ('log_date', models.DateTimeField(auto_now_add=True)),
+                ('log_type', models.CharField(choices=[('in', 'Blood In'), ('out', 'Blood Out')], max_length=3)),
+                ('blood_bank', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='donation_logs', to='api.bloodbank')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Inventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('blood_group', models.CharField(max_length=5)),
+                ('units', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('blood_bank', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory', to='api.bloodbank')),
+            ],
+            options={
+                'ordering': ['blood_bank', 'blood_group'],
+                'verbose_name_plural': 'inventory',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='inventory',
+            constraint=models.UniqueConstraint(fields=('blood_bank', 'blood_group'), name='unique_inventory_bank_group'),
+        ),
+        migrations.RunPython(build_inventory, migrations.RunPython.noop),
+    ]
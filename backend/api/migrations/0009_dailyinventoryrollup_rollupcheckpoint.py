@@ -0,0 +1,42 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0008_location_coordinates_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyInventoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('blood_group', models.CharField(max_length=5)),
+                ('log_type', models.CharField(choices=[('in', 'Blood In'), ('out', 'Blood Out')], max_length=3)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('blood_bank', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='api.bloodbank')),
+            ],
+            options={
+                'ordering': ['day', 'blood_bank', 'blood_group', 'log_type'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailyinventoryrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'blood_bank', 'blood_group', 'log_type'), name='unique_daily_rollup'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyinventoryrollup',
+            index=models.Index(fields=['blood_bank', 'day'], name='api_dailyin_blood_b_c2141e_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+def fill_next_eligible_date(apps, schema_editor):
+    Donor = apps.get_model('api', 'Donor')
+    deferral = timedelta(days=getattr(settings, 'DONATION_DEFERRAL_DAYS', 90))
+
+    donors = []
+    for donor in Donor.objects.only('pk', 'last_donation', 'created_at').iterator():
+        donor.next_eligible_date = (
+            donor.last_donation + deferral if donor.last_donation else donor.created_at.date()
+        )
+        donors.append(donor)
+    Donor.objects.bulk_update(donors, ['next_eligible_date'], batch_size=1000)
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0009_dailyinventoryrollup_rollupcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donor',
+            name='next_eligible_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='donor',
+            index=models.Index(fields=['blood_group', 'next_eligible_date', 'is_available'], name='api_donor_blood_g_ae479e_idx'),
+        ),
+        migrations.RunPython(fill_next_eligible_date, migrations.RunPython.noop),
+    ]
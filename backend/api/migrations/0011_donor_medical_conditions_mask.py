@@ -0,0 +1,106 @@
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of api.medical_conditions as of this migration, so later
+# vocabulary changes cannot alter what it computes
+MEDICAL_CONDITIONS = (
+    'other',
+    'anemia',
+    'asthma',
+    'bleeding_disorder',
+    'cancer',
+    'diabetes',
+    'epilepsy',
+    'heart_disease',
+    'hepatitis_b',
+    'hepatitis_c',
+    'hiv',
+    'hypertension',
+    'kidney_disease',
+    'malaria',
+    'pregnancy',
+    'recent_surgery',
+    'recent_tattoo',
+    'thyroid_disorder',
+    'tuberculosis',
+)
+
+CONDITION_BITS = {name: 1 << bit for bit, name in enumerate(MEDICAL_CONDITIONS)}
+
+CONDITION_ALIASES = {
+    'anaemia': 'anemia',
+    'low hemoglobin': 'anemia',
+    'low haemoglobin': 'anemia',
+    'haemophilia': 'bleeding_disorder',
+    'hemophilia': 'bleeding_disorder',
+    'diabetic': 'diabetes',
+    'diabetes mellitus': 'diabetes',
+    'sugar': 'diabetes',
+    'seizures': 'epilepsy',
+    'heart condition': 'heart_disease',
+    'cardiac disease': 'heart_disease',
+    'hep b': 'hepatitis_b',
+    'hepatitis b': 'hepatitis_b',
+    'hbv': 'hepatitis_b',
+    'hep c': 'hepatitis_c',
+    'hepatitis c': 'hepatitis_c',
+    'hcv': 'hepatitis_c',
+    'hiv/aids': 'hiv',
+    'aids': 'hiv',
+    'high blood pressure': 'hypertension',
+    'high bp': 'hypertension',
+    'bp': 'hypertension',
+    'kidney disease': 'kidney_disease',
+    'renal disease': 'kidney_disease',
+    'pregnant': 'pregnancy',
+    'surgery': 'recent_surgery',
+    'tattoo': 'recent_tattoo',
+    'piercing': 'recent_tattoo',
+    'thyroid': 'thyroid_disorder',
+    'hypothyroidism': 'thyroid_disorder',
+    'hyperthyroidism': 'thyroid_disorder',
+    'tb': 'tuberculosis',
+}
+
+
+def conditions_mask(text):
+    mask = 0
+    for entry in (text or '').split(','):
+        key = re.sub(r'\s+', ' ', entry.strip().lower())
+        if not key:
+            continue
+        name = key.replace(' ', '_').replace('-', '_')
+        if name not in CONDITION_BITS:
+            name = CONDITION_ALIASES.get(key.replace('-', ' '), 'other')
+        mask |= CONDITION_BITS[name]
+    return mask
+
+def fill_conditions_mask(apps, schema_editor):
+    Donor = apps.get_model('api', 'Donor')
+
+    with_conditions = Donor.objects.exclude(medical_conditions__isnull=True).exclude(medical_conditions='')
+
+    donors = []
+    for donor in with_conditions.only('pk', 'medical_conditions').iterator():
+        donor.medical_conditions_mask = conditions_mask(donor.medical_conditions)
+        donors.append(donor)
+    Donor.objects.bulk_update(donors, ['medical_conditions_mask'], batch_size=1000)
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0010_donor_next_eligible_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donor',
+            name='medical_conditions_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='donor',
+            index=models.Index(fields=['medical_conditions_mask'], name='api_donor_medical_05b4a0_idx'),
+        ),
+        migrations.RunPython(fill_conditions_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Legacy upper-case statuses and their current values
+DONATION_STATUSES = {'SCHEDULED': 'scheduled', 'COMPLETED': 'completed', 'CANCELLED': 'cancelled'}
+REQUEST_STATUSES = {'PENDING': 'pending', 'ACCEPTED': 'approved', 'COMPLETED': 'completed', 'CANCELLED': 'rejected'}
+
+def convert_legacy_rows(apps, schema_editor):
+    BloodBank = apps.get_model('api', 'BloodBank')
+    Donation = apps.get_model('api', 'Donation')
+    DonationRequest = apps.get_model('api', 'DonationRequest')
+
+    Donor = apps.get_model('api', 'Donor')
+
+    for old, new in DONATION_STATUSES.items():
+        Donation.objects.filter(status=old).update(status=new)
+
+    # Donations pointed at the donor profile; they now point at its user
+    users = dict(Donor.objects.values_list('pk', 'user_id'))
+    donations = list(Donation.objects.only('pk', 'donor_id'))
+    for donation in donations:
+        donation.donor_user_id = users[donation.donor_id]
+    Donation.objects.bulk_update(donations, ['donor_user'], batch_size=1000)
+
+    requests = list(DonationRequest.objects.all())
+    if not requests:
+        return
+
+    # Requests did not name a bank; file them under the first one
+    bank = BloodBank.objects.order_by('pk').first()
+    if bank is None:
+        bank = BloodBank.objects.create(name='Unassigned', address='', timing='', phone='')
+    for request in requests:
+        request.blood_bank = bank
+        request.status = REQUEST_STATUSES.get(request.status, request.status)
+        request.reason = ', '.join(part for part in (request.hospital_name, request.hospital_address) if part)
+    DonationRequest.objects.bulk_update(requests, ['blood_bank', 'status', 'reason'], batch_size=1000)
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0013_broadcast'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='donation',
+            old_name='created_at',
+            new_name='donation_date',
+        ),
+        migrations.AddField(
+            model_name='donation',
+            name='units',
+            field=models.PositiveIntegerField(default=1),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='donation',
+            name='donor_user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RemoveIndex(
+            model_name='donationrequest',
+            name='api_donatio_blood_g_028517_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='donationrequest',
+            name='api_donatio_urgency_ec5cbb_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='donationrequest',
+            name='api_donatio_status_3245a1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='donationrequest',
+            name='api_donatio_require_68fff8_idx',
+        ),
+        migrations.RenameField(
+            model_name='donationrequest',
+            old_name='created_at',
+            new_name='request_date',
+        ),
+        migrations.RenameField(
+            model_name='donationrequest',
+            old_name='units_needed',
+            new_name='units',
+        ),
+        migrations.AddField(
+            model_name='donationrequest',
+            name='blood_bank',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='donation_requests', to='api.bloodbank'),
+        ),
+        migrations.AddField(
+            model_name='donationrequest',
+            name='reason',
+            field=models.TextField(default=''),
+            preserve_default=False,
+        ),
+        migrations.RunPython(convert_legacy_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0014_donation_request_fields'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='donation',
+            name='completed_date',
+        ),
+        migrations.RemoveField(
+            model_name='donation',
+            name='request',
+        ),
+        migrations.RemoveField(
+            model_name='donation',
+            name='scheduled_date',
+        ),
+        migrations.RemoveField(
+            model_name='donation',
+            name='updated_at',
+        ),
+        migrations.RemoveField(
+            model_name='donation',
+            name='donor',
+        ),
+        migrations.RenameField(
+            model_name='donation',
+            old_name='donor_user',
+            new_name='donor',
+        ),
+        migrations.AlterField(
+            model_name='donation',
+            name='donor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='donations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='donation',
+            name='status',
+            field=models.CharField(choices=[('scheduled', 'Scheduled'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], default='scheduled', max_length=20),
+        ),
+        migrations.RemoveField(
+            model_name='donationrequest',
+            name='hospital_address',
+        ),
+        migrations.RemoveField(
+            model_name='donationrequest',
+            name='hospital_name',
+        ),
+        migrations.RemoveField(
+            model_name='donationrequest',
+            name='required_date',
+        ),
+        migrations.RemoveField(
+            model_name='donationrequest',
+            name='updated_at',
+        ),
+        migrations.RemoveField(
+            model_name='donationrequest',
+            name='urgency_level',
+        ),
+        migrations.AlterField(
+            model_name='donationrequest',
+            name='blood_bank',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='donation_requests', to='api.bloodbank'),
+        ),
+        migrations.AlterField(
+            model_name='donationrequest',
+            name='blood_group',
+            field=models.CharField(max_length=5),
+        ),
+        migrations.AlterField(
+            model_name='donationrequest',
+            name='requester',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='donation_requests', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='donationrequest',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('completed', 'Completed')], default='pending', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='bloodbank',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='bloodbank',
+            name='phone',
+            field=models.CharField(max_length=15),
+        ),
+    ]
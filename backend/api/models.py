@@ -1,8 +1,13 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator, MinValueValidator
 from django.utils import timezone
 
+from .medical_conditions import conditions_mask
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     phone_number = models.CharField(
@@ -38,12 +43,16 @@ class Donor(models.Model):
     last_donation = models.DateField(null=True, blank=True)
     is_available = models.BooleanField(default=True)
     medical_conditions = models.TextField(blank=True, null=True)  # Store as comma-separated values
+    # Bit per api.medical_conditions.MEDICAL_CONDITIONS entry, derived on save
+    medical_conditions_mask = models.BigIntegerField(default=0, editable=False)
     weight = models.DecimalField(
         max_digits=5, 
         decimal_places=2,
         validators=[MinValueValidator(45.0)]  # Minimum weight for donation
     )
     height = models.DecimalField(max_digits=5, decimal_places=2)
+    # Derived from last_donation on save; see compute_next_eligible_date
+    next_eligible_date = models.DateField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -52,11 +61,36 @@ class Donor(models.Model):
             models.Index(fields=['blood_group']),
             models.Index(fields=['is_available']),
             models.Index(fields=['last_donation']),
+            # "Eligible <group> donors on <day>" is one range scan
+            models.Index(fields=['blood_group', 'next_eligible_date', 'is_available']),
+            models.Index(fields=['medical_conditions_mask']),
         ]
 
     def __str__(self):
         return f"{self.user.username} - {self.blood_group}"
 
+    def compute_next_eligible_date(self):
+        """
+        First day this donor may give again: the deferral interval after the
+        last donation, or the registration date for donors who never gave.
+        """
+        if self.last_donation:
+            return self.last_donation + timedelta(days=settings.DONATION_DEFERRAL_DAYS)
+        return self.created_at.date() if self.created_at else timezone.localdate()
+
+    def save(self, *args, **kwargs):
+        self.next_eligible_date = self.compute_next_eligible_date()
+        self.medical_conditions_mask = conditions_mask(self.medical_conditions)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'last_donation' in update_fields:
+                update_fields.add('next_eligible_date')
+            if 'medical_conditions' in update_fields:
+                update_fields.add('medical_conditions_mask')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     @property
     def medical_conditions_list(self):
         if self.medical_conditions:
@@ -73,6 +107,12 @@ class Location(models.Model):
     country = models.CharField(max_length=100)
     postal_code = models.CharField(max_length=20)
 
+    class Meta:
+        indexes = [
+            # Bounding-box prefilter for nearby donor searches
+            models.Index(fields=['latitude', 'longitude']),
+        ]
+
     def __str__(self):
         return f"{self.donor.user.username}'s location"
 
@@ -110,6 +150,12 @@ class Donation(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled')
     notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Covers the per-bank availability aggregate
+            models.Index(fields=['blood_bank', 'status', 'blood_group']),
+        ]
+
     def __str__(self):
         return f"{self.donor.username} - {self.blood_group}"
 
@@ -155,4 +201,140 @@ class DonationLog(models.Model):
     log_type = models.CharField(max_length=3, choices=LOG_TYPE_CHOICES)
 
     def __str__(self):
-        return f"{self.blood_bank.name} - {self.blood_group} - {self.log_type}" 
\ No newline at end of file
+        return f"{self.blood_bank.name} - {self.blood_group} - {self.log_type}"
+
+class Inventory(models.Model):
+    """
+    Current stock per blood bank and blood group, kept in step with every
+    DonationLog write so stock reads never rescan the log.
+    """
+    blood_bank = models.ForeignKey(BloodBank, on_delete=models.CASCADE, related_name='inventory')
+    blood_group = models.CharField(max_length=5)
+    units = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['blood_bank', 'blood_group'], name='unique_inventory_bank_group'),
+        ]
+        ordering = ['blood_bank', 'blood_group']
+        verbose_name_plural = 'inventory'
+
+    def __str__(self):
+        return f"{self.blood_bank.name} - {self.blood_group}: {self.units}"
+
+class DailyInventoryRollup(models.Model):
+    """
+    DonationLog units and entry counts summed per day, blood bank, blood
+    group and log type, maintained by the rollup_donation_logs command so
+    trend charts read a handful of rows instead of the raw log.
+    """
+    day = models.DateField()
+    blood_bank = models.ForeignKey(BloodBank, on_delete=models.CASCADE, related_name='daily_rollups')
+    blood_group = models.CharField(max_length=5)
+    log_type = models.CharField(max_length=3, choices=DonationLog.LOG_TYPE_CHOICES)
+    units = models.PositiveIntegerField(default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'blood_bank', 'blood_group', 'log_type'],
+                name='unique_daily_rollup'
+            ),
+        ]
+        indexes = [
+            # Per-bank trend queries over a date range
+            models.Index(fields=['blood_bank', 'day']),
+        ]
+        ordering = ['day', 'blood_bank', 'blood_group', 'log_type']
+
+    def __str__(self):
+        return f"{self.day} {self.blood_bank.name} - {self.blood_group} {self.log_type}: {self.units}"
+
+class RollupCheckpoint(models.Model):
+    """Highest source row ID a rollup job has folded in."""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_id}"
+
+class Notification(models.Model):
+    """
+    Outbox entry for one message to a donor. Requests only insert rows;
+    the send_notifications command claims and delivers them.
+    """
+    CHANNEL_CHOICES = [
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    donor = models.ForeignKey(Donor, on_delete=models.CASCADE, related_name='notifications')
+    sender = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='sent_notifications'
+    )
+    # Set for messages fanned out by an emergency broadcast
+    broadcast = models.ForeignKey(
+        'Broadcast', on_delete=models.CASCADE, null=True, blank=True, related_name='notifications'
+    )
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES, default='email')
+    subject = models.CharField(max_length=200, blank=True)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Worker holding the row while it is 'sending'
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim due pending rows in next_attempt_at order
+            models.Index(fields=['status', 'next_attempt_at']),
+            # Per-donor rate limit: messages sent within the window
+            models.Index(fields=['donor', 'status', 'sent_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.donor.user.username} ({self.status})"
+
+class Broadcast(models.Model):
+    """
+    One emergency message sent to every eligible donor compatible with a
+    recipient blood group within a radius. Each recipient gets a
+    Notification linked back here; their statuses are its progress.
+    """
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='broadcasts')
+    # Recipient group; compatible donor groups are expanded from it
+    blood_group = models.CharField(max_length=5)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    radius_km = models.FloatField()
+    excluded_conditions = models.CharField(max_length=200, blank=True)
+    channel = models.CharField(max_length=10, choices=Notification.CHANNEL_CHOICES, default='sms')
+    subject = models.CharField(max_length=200, blank=True)
+    message = models.TextField()
+    recipient_count = models.PositiveIntegerField(default=0)
+    # Donors in range skipped because a recent broadcast already reached them
+    duplicate_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Recent broadcasts, for recipient deduplication
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.blood_group} within {self.radius_km} km ({self.created_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,285 @@
+"""
+Database-backed outbox for donor notifications.
+
+API requests call ``enqueue_notification``, which is a single INSERT.
+Delivery happens in the send_notifications command: each worker claims a
+batch of due rows (``select_for_update(skip_locked=True)`` where the
+database supports it), marks them 'sending' under its own worker ID and
+hands them to the configured backend. Throughput scales by running more
+workers. Failed sends are retried with exponential backoff until
+MAX_ATTEMPTS, and donors who were sent RATE_LIMIT messages within
+RATE_LIMIT_WINDOW seconds have further messages deferred rather than
+dropped. Emergency broadcast messages are
+exempt from the rate limit (api.broadcasts deduplicates them instead),
+though they count toward it.
+
+Backends are named by dotted path in the NOTIFICATIONS setting. The
+console and file backends here are stand-ins for real email and SMS
+gateways.
+"""
+import json
+import os
+import socket
+import sys
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notification, UserProfile
+
+DEFAULT_NOTIFICATION_SETTINGS = {
+    'BACKEND': 'api.notifications.ConsoleBackend',
+    'FILE_PATH': 'notifications.log',
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 30,
+    'MAX_RETRY_DELAY': 3600,
+    'RATE_LIMIT': 3,
+    'RATE_LIMIT_WINDOW': 3600,
+    'LOCK_TIMEOUT': 300,
+    'BROADCAST_DEDUPE_WINDOW': 21600,
+}
+
+ADDRESS_LABELS = {'email': 'email address', 'sms': 'phone number'}
+
+
+def notification_settings():
+    return {**DEFAULT_NOTIFICATION_SETTINGS, **getattr(settings, 'NOTIFICATIONS', {})}
+
+
+class BaseNotificationBackend:
+    """
+    Delivers claimed notifications. Subclasses implement ``send`` for one
+    message, or override ``send_messages`` to deliver a batch at once.
+    Each notification carries the resolved ``address`` attribute.
+    """
+
+    def __init__(self, options):
+        self.options = options
+
+    def send(self, notification):
+        raise NotImplementedError
+
+    def send_messages(self, notifications):
+        """
+        Returns:
+            dict: Error messages keyed by the ID of each notification that failed
+        """
+        failures = {}
+        for notification in notifications:
+            try:
+                self.send(notification)
+            except Exception as e:
+                failures[notification.pk] = str(e) or e.__class__.__name__
+        return failures
+
+
+class ConsoleBackend(BaseNotificationBackend):
+    """Writes each message to stdout."""
+
+    def __init__(self, options, stream=None):
+        super().__init__(options)
+        self.stream = stream or sys.stdout
+
+    def send(self, notification):
+        self.stream.write(
+            f"[{notification.channel}] to {notification.address}: {notification.subject}\n"
+            f"{notification.body}\n\n"
+        )
+        self.stream.flush()
+
+
+class FileBackend(BaseNotificationBackend):
+    """Appends each batch to FILE_PATH as JSON lines."""
+
+    def send_messages(self, notifications):
+        lines = ''.join(
+            json.dumps({
+                'id': notification.pk,
+                'channel': notification.channel,
+                'to': notification.address,
+                'subject': notification.subject,
+                'body': notification.body,
+                'sent_at': timezone.now().isoformat(),
+            }) + '\n'
+            for notification in notifications
+        )
+        try:
+            with open(self.options['FILE_PATH'], 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except OSError as e:
+            return {notification.pk: str(e) for notification in notifications}
+        return {}
+
+
+def get_notification_backend(options=None):
+    options = options or notification_settings()
+    return import_string(options['BACKEND'])(options)
+
+
+def enqueue_notification(donor, body, subject='', channel='email', sender=None):
+    """
+    Queue a message for a donor; delivery is left to the workers.
+
+    Returns:
+        Notification: The pending outbox row
+    """
+    return Notification.objects.create(
+        donor=donor, sender=sender, channel=channel, subject=subject, body=body
+    )
+
+
+def worker_id():
+    """Identifier unique to this worker process, stored on claimed rows."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def release_stale_claims(lock_timeout, now=None):
+    """
+    Return rows left 'sending' by a worker that died back to the queue.
+
+    Returns:
+        int: The number of rows released
+    """
+    now = now or timezone.now()
+    return Notification.objects.filter(
+        status='sending', locked_at__lt=now - timedelta(seconds=lock_timeout)
+    ).update(status='pending', locked_by='', locked_at=None)
+
+
+def claim_batch(worker, batch_size, now=None):
+    """
+    Mark up to ``batch_size`` due pending rows as 'sending' for ``worker``.
+
+    Where the database supports it, rows are picked with SELECT ... FOR
+    UPDATE SKIP LOCKED, so concurrent workers take disjoint batches
+    without waiting on each other. Elsewhere (SQLite) the claim is a
+    single UPDATE over a subquery, which the database serializes.
+
+    Returns:
+        list: The claimed notifications, with donor and user loaded
+    """
+    now = now or timezone.now()
+    due = (
+        Notification.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')
+    )
+    claim = {'status': 'sending', 'locked_by': worker, 'locked_at': now}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return []
+            Notification.objects.filter(id__in=ids).update(**claim)
+    else:
+        ids = due.values('id')[:batch_size]
+        if not Notification.objects.filter(id__in=ids, status='pending').update(**claim):
+            return []
+
+    return list(
+        Notification.objects.filter(status='sending', locked_by=worker)
+        .select_related('donor__user')
+        .order_by('next_attempt_at', 'id')
+    )
+
+
+def _addresses(notifications):
+    phones = {}
+    sms_users = {n.donor.user_id for n in notifications if n.channel == 'sms'}
+    if sms_users:
+        phones = dict(
+            UserProfile.objects.filter(user_id__in=sms_users).values_list('user_id', 'phone_number')
+        )
+    return {
+        n.pk: phones.get(n.donor.user_id) if n.channel == 'sms' else n.donor.user.email
+        for n in notifications
+    }
+
+
+def retry_delay(attempts, options):
+    """Seconds before retry number ``attempts``: RETRY_BACKOFF doubled per attempt, capped."""
+    return min(options['RETRY_BACKOFF'] * 2 ** (attempts - 1), options['MAX_RETRY_DELAY'])
+
+
+def process_batch(worker, backend=None, options=None):
+    """
+    Claim one batch and deliver it.
+
+    Returns:
+        Counter: claimed, sent, retried, failed and deferred counts
+    """
+    options = options or notification_settings()
+    backend = backend or get_notification_backend(options)
+    stats = Counter()
+
+    claimed = claim_batch(worker, options['BATCH_SIZE'])
+    if not claimed:
+        return stats
+    stats['claimed'] = len(claimed)
+
+    now = timezone.now()
+    rate_limit = options['RATE_LIMIT']
+    window = timedelta(seconds=options['RATE_LIMIT_WINDOW'])
+    recent = Counter()
+    if rate_limit:
+        recent.update(dict(
+            Notification.objects.filter(
+                donor_id__in={n.donor_id for n in claimed}, status='sent', sent_at__gte=now - window
+            )
+            .order_by()
+            .values_list('donor_id')
+            .annotate(sent=Count('id'))
+        ))
+
+    addresses = _addresses(claimed)
+    deliverable = []
+    for notification in claimed:
+        notification.locked_by = ''
+        notification.locked_at = None
+        notification.address = addresses[notification.pk]
+        if not notification.address:
+            notification.status = 'failed'
+            notification.last_error = f"Donor has no {ADDRESS_LABELS[notification.channel]}"
+            stats['failed'] += 1
+        elif rate_limit and not notification.broadcast_id and recent[notification.donor_id] >= rate_limit:
+            notification.status = 'pending'
+            notification.next_attempt_at = now + window
+            stats['deferred'] += 1
+        else:
+            recent[notification.donor_id] += 1
+            deliverable.append(notification)
+
+    failures = backend.send_messages(deliverable) if deliverable else {}
+    sent_at = timezone.now()
+    for notification in deliverable:
+        notification.attempts += 1
+        error = failures.get(notification.pk)
+        if error is None:
+            notification.status = 'sent'
+            notification.sent_at = sent_at
+            notification.last_error = ''
+            stats['sent'] += 1
+        elif notification.attempts >= options['MAX_ATTEMPTS']:
+            notification.status = 'failed'
+            notification.last_error = error
+            stats['failed'] += 1
+        else:
+            notification.status = 'pending'
+            notification.next_attempt_at = sent_at + timedelta(
+                seconds=retry_delay(notification.attempts, options)
+            )
+            notification.last_error = error
+            stats['retried'] += 1
+
+    Notification.objects.bulk_update(
+        claimed,
+        ['status', 'attempts', 'next_attempt_at', 'locked_by', 'locked_at', 'last_error', 'sent_at']
+    )
+    return stats
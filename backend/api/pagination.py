@@ -0,0 +1,24 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key, newest first.
+
+    Each page is fetched with ``WHERE id < <cursor> ORDER BY id DESC LIMIT n``,
+    so deep pages cost the same as the first one and stay stable while new
+    rows are inserted.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        # Read per request so settings overrides apply
+        return getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+
+
+class NameCursorPagination(IdCursorPagination):
+    """Keyset pagination in name order, ties broken by primary key."""
+    ordering = ('name', 'id')
@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code runs more queries than its budget."""
+
+
+@contextmanager
+def query_budget(max_queries, label='block', using='default'):
+    """
+    Fail if the wrapped block runs more than ``max_queries`` queries.
+
+    Usage::
+
+        with query_budget(2, label='GET /api/donations/'):
+            client.get('/api/donations/')
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+
+    if len(context) > max_queries:
+        statements = '\n'.join(query['sql'] for query in context.captured_queries)
+        raise QueryBudgetExceeded(
+            f"{label} ran {len(context)} queries, budget is {max_queries}:\n{statements}"
+        )
+
@@ -0,0 +1,175 @@
+"""
+Daily DonationLog rollups for trend charts.
+
+``roll_up_logs`` folds logs newer than the stored checkpoint into
+DailyInventoryRollup. Logs are treated as append-only: edits or deletes
+to logs that were already rolled up are only picked up by
+``backfill_rollups``. Days are calendar days in the project TIME_ZONE.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek, TruncYear
+
+from .models import DailyInventoryRollup, DonationLog, RollupCheckpoint
+
+CHECKPOINT_NAME = 'daily_inventory_rollup'
+DEFAULT_BATCH_SIZE = 10000
+
+TREND_PERIODS = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+
+
+def _add_to_rollup(day, blood_bank_id, blood_group, log_type, units, count):
+    rows = DailyInventoryRollup.objects.filter(
+        day=day, blood_bank_id=blood_bank_id, blood_group=blood_group, log_type=log_type
+    )
+    if rows.update(units=F('units') + units, count=F('count') + count):
+        return
+
+    try:
+        with transaction.atomic():
+            DailyInventoryRollup.objects.create(
+                day=day, blood_bank_id=blood_bank_id, blood_group=blood_group,
+                log_type=log_type, units=units, count=count
+            )
+    except IntegrityError:
+        rows.update(units=F('units') + units, count=F('count') + count)
+
+
+def _daily_totals(logs):
+    return (
+        logs.order_by()
+        .annotate(day=TruncDate('log_date'))
+        .values('day', 'blood_bank_id', 'blood_group', 'log_type')
+        .annotate(total_units=Sum('units'), log_count=Count('id'))
+    )
+
+
+def _rollup_fields(row):
+    return {
+        'day': row['day'],
+        'blood_bank_id': row['blood_bank_id'],
+        'blood_group': row['blood_group'],
+        'log_type': row['log_type'],
+        'units': row['total_units'],
+        'count': row['log_count'],
+    }
+
+
+def roll_up_logs(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Fold DonationLog rows newer than the checkpoint into the rollup table,
+    one transaction per batch of log IDs.
+
+    Returns:
+        int: The number of logs processed
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            # Locking the checkpoint keeps concurrent runs from double counting
+            checkpoint, _ = RollupCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+            checkpoint = RollupCheckpoint.objects.select_for_update().get(pk=checkpoint.pk)
+
+            batch_ids = list(
+                DonationLog.objects.filter(id__gt=checkpoint.last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not batch_ids:
+                return processed
+
+            logs = DonationLog.objects.filter(id__gt=checkpoint.last_id, id__lte=batch_ids[-1])
+            for row in _daily_totals(logs):
+                _add_to_rollup(**_rollup_fields(row))
+
+            checkpoint.last_id = batch_ids[-1]
+            checkpoint.save(update_fields=['last_id', 'updated_at'])
+            processed += len(batch_ids)
+
+
+@transaction.atomic
+def backfill_rollups(since=None):
+    """
+    Rebuild rollups from the raw log, for every day or from ``since`` on,
+    and move the checkpoint to the newest log.
+
+    Args:
+        since (date, optional): First day to rebuild; earlier rows are kept
+
+    Returns:
+        int: The number of rollup rows written
+    """
+    checkpoint, _ = RollupCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+    checkpoint = RollupCheckpoint.objects.select_for_update().get(pk=checkpoint.pk)
+
+    rollups = DailyInventoryRollup.objects.all()
+    logs = DonationLog.objects.all()
+    if since is not None:
+        rollups = rollups.filter(day__gte=since)
+        logs = logs.filter(log_date__date__gte=since)
+    rollups.delete()
+
+    last_id = DonationLog.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    rows = DailyInventoryRollup.objects.bulk_create(
+        [DailyInventoryRollup(**_rollup_fields(row)) for row in _daily_totals(logs.filter(id__lte=last_id))],
+        batch_size=1000
+    )
+
+    checkpoint.last_id = last_id
+    checkpoint.save(update_fields=['last_id', 'updated_at'])
+    return len(rows)
+
+
+def inventory_trend(period, blood_bank=None, blood_group=None, start=None, end=None):
+    """
+    Units in and out per period and blood group, read from the rollups.
+
+    Args:
+        period (str): One of TREND_PERIODS
+        blood_bank (int, optional): Only this blood bank; all banks otherwise
+        blood_group (str, optional): Only this blood group
+        start (date, optional): First day included
+        end (date, optional): Last day included
+
+    Returns:
+        list: Dicts with period, blood_group, units_in, units_out, net and logs,
+            ordered by period then blood group
+    """
+    rollups = DailyInventoryRollup.objects.all()
+    if blood_bank is not None:
+        rollups = rollups.filter(blood_bank_id=blood_bank)
+    if blood_group:
+        rollups = rollups.filter(blood_group=blood_group)
+    if start is not None:
+        rollups = rollups.filter(day__gte=start)
+    if end is not None:
+        rollups = rollups.filter(day__lte=end)
+
+    totals = (
+        rollups.order_by()
+        .annotate(period=TREND_PERIODS[period]('day'))
+        .values('period', 'blood_group', 'log_type')
+        .annotate(total_units=Sum('units'), log_count=Sum('count'))
+    )
+
+    trend = defaultdict(lambda: {'units_in': 0, 'units_out': 0, 'logs': 0})
+    for row in totals:
+        entry = trend[(row['period'], row['blood_group'])]
+        entry['units_in' if row['log_type'] == 'in' else 'units_out'] += row['total_units']
+        entry['logs'] += row['log_count']
+
+    return [
+        {
+            'period': period_start,
+            'blood_group': blood_group,
+            **entry,
+            'net': entry['units_in'] - entry['units_out'],
+        }
+        for (period_start, blood_group), entry in sorted(trend.items())
+    ]
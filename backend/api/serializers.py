@@ -8,13 +8,16 @@ from .models import (
     Donation,
     DonationHistory,
     BloodBank,
-    DonationLog
+    DonationLog,
+    Inventory,
+    Broadcast,
+    Notification
 )
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'phone', 'blood_group', 'is_donor', 'is_recipient', 'is_blood_bank')
+        fields = ('id', 'username', 'email', 'first_name', 'last_name')
         read_only_fields = ('id',)
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -39,9 +42,9 @@ class DonorSerializer(serializers.ModelSerializer):
         model = Donor
         fields = (
             'id', 'user', 'blood_group', 'last_donation', 'is_available',
-            'medical_conditions', 'weight', 'height', 'location'
+            'medical_conditions', 'weight', 'height', 'location', 'next_eligible_date'
         )
-        read_only_fields = ('id', 'last_donation')
+        read_only_fields = ('id', 'last_donation', 'next_eligible_date')
 
 class BloodBankSerializer(serializers.ModelSerializer):
     class Meta:
@@ -63,17 +66,33 @@ class DonationRequestSerializer(serializers.ModelSerializer):
 
 class DonationSerializer(serializers.ModelSerializer):
     blood_bank = BloodBankSerializer(read_only=True)
-    donor = DonorSerializer(read_only=True)
-    request = DonationRequestSerializer(read_only=True)
+    donor = UserSerializer(read_only=True)
     status = serializers.CharField(read_only=True)
 
     class Meta:
         model = Donation
         fields = (
-            'id', 'donor', 'request', 'blood_bank', 'blood_group', 'units', 'donation_date', 'status', 'notes'
+            'id', 'donor', 'blood_bank', 'blood_group', 'units', 'donation_date', 'status', 'notes'
         )
         read_only_fields = ('id', 'donation_date', 'status')
 
+class DonationIngestSerializer(serializers.Serializer):
+    """
+    Validates one row of a bulk donation upload. Related IDs are checked
+    for the whole batch at once, not per row.
+    """
+    donor = serializers.IntegerField(min_value=1)
+    blood_bank = serializers.IntegerField(min_value=1)
+    blood_group = serializers.ChoiceField(choices=Donor.BLOOD_GROUPS)
+    units = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=Donation.STATUS_CHOICES, default='completed')
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+class DonorContactSerializer(serializers.Serializer):
+    """Validates a contact request; a blank message gets a default text."""
+    channel = serializers.ChoiceField(choices=Notification.CHANNEL_CHOICES, default='email')
+    message = serializers.CharField(required=False, allow_blank=True, default='')
+
 class DonationHistorySerializer(serializers.ModelSerializer):
     donation = DonationSerializer(read_only=True)
 
@@ -124,4 +143,30 @@ class DonationLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = DonationLog
         fields = ['id', 'blood_bank', 'blood_group', 'units', 'log_date', 'log_type']
-        read_only_fields = ['id', 'log_date'] 
\ No newline at end of file
+        read_only_fields = ['id', 'log_date']
+
+class InventorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Inventory
+        fields = ['blood_bank', 'blood_group', 'units', 'updated_at']
+        read_only_fields = ['blood_bank', 'blood_group', 'units', 'updated_at']
+
+class BroadcastSerializer(serializers.ModelSerializer):
+    blood_group = serializers.ChoiceField(choices=Donor.BLOOD_GROUPS)
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(min_value=0)
+    # Outbox progress, annotated by api.broadcasts.with_progress
+    pending = serializers.IntegerField(read_only=True)
+    sending = serializers.IntegerField(read_only=True)
+    sent = serializers.IntegerField(read_only=True)
+    failed = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Broadcast
+        fields = [
+            'id', 'blood_group', 'latitude', 'longitude', 'radius_km', 'excluded_conditions',
+            'channel', 'subject', 'message', 'recipient_count', 'duplicate_count', 'created_at',
+            'pending', 'sending', 'sent', 'failed'
+        ]
+        read_only_fields = ['id', 'recipient_count', 'duplicate_count', 'created_at']
@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .directory_cache import invalidate_directory, record_deletion
+from .donation_snapshot import loaded_donation_snapshot
+from .donor_locator import loaded_donor_locator
+from .inventory import apply_inventory_delta, log_delta
+from .models import BloodBank, Donation, DonationLog, Donor, Location
+from .sqlite import configure_connection
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        configure_connection(connection)
+
+
+@receiver(pre_save, sender=DonationLog)
+def remember_previous_log(sender, instance, **kwargs):
+    # Keep the stored values so an edited log can be reversed first
+    instance._inventory_previous = None
+    if instance.pk:
+        instance._inventory_previous = (
+            DonationLog.objects.filter(pk=instance.pk)
+            .values_list('blood_bank_id', 'blood_group', 'log_type', 'units')
+            .first()
+        )
+
+
+@receiver(post_save, sender=DonationLog)
+def update_inventory_on_log_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    with transaction.atomic():
+        previous = getattr(instance, '_inventory_previous', None)
+        if previous:
+            bank_id, group, log_type, units = previous
+            apply_inventory_delta(bank_id, group, -log_delta(log_type, units), create=False)
+        apply_inventory_delta(
+            instance.blood_bank_id,
+            instance.blood_group,
+            log_delta(instance.log_type, instance.units)
+        )
+
+
+@receiver(post_delete, sender=DonationLog)
+def update_inventory_on_log_delete(sender, instance, **kwargs):
+    # Only adjust existing rows; the bank itself may be mid-delete
+    apply_inventory_delta(
+        instance.blood_bank_id,
+        instance.blood_group,
+        -log_delta(instance.log_type, instance.units),
+        create=False
+    )
+
+
+@receiver(post_save, sender=Location)
+def update_locator_on_location_save(sender, instance, raw=False, **kwargs):
+    locator = loaded_donor_locator()
+    if locator is None or raw:
+        return
+
+    donor = instance.donor
+    row = (instance.donor_id, instance.latitude, instance.longitude, donor.blood_group, donor.is_available)
+    transaction.on_commit(lambda: locator.upsert(*row))
+
+
+@receiver(post_delete, sender=Location)
+def update_locator_on_location_delete(sender, instance, **kwargs):
+    locator = loaded_donor_locator()
+    if locator is not None:
+        donor_id = instance.donor_id
+        transaction.on_commit(lambda: locator.remove(donor_id))
+
+
+@receiver(post_save, sender=Donor)
+def update_locator_on_donor_save(sender, instance, raw=False, **kwargs):
+    locator = loaded_donor_locator()
+    if locator is None or raw:
+        return
+
+    donor_id, blood_group, is_available = instance.pk, instance.blood_group, instance.is_available
+    transaction.on_commit(lambda: locator.update_donor(donor_id, blood_group, is_available))
+
+
+@receiver(post_delete, sender=Donor)
+def update_locator_on_donor_delete(sender, instance, **kwargs):
+    locator = loaded_donor_locator()
+    if locator is not None:
+        donor_id = instance.pk
+        transaction.on_commit(lambda: locator.remove(donor_id))
+
+
+@receiver(post_save, sender=BloodBank)
+@receiver(post_delete, sender=BloodBank)
+def invalidate_directory_cache(sender, **kwargs):
+    invalidate_directory()
+
+
+@receiver(post_delete, sender=BloodBank)
+def record_directory_deletion(sender, **kwargs):
+    record_deletion()
+
+
+def _mark_snapshot_stale(dataset):
+    snapshot = loaded_donation_snapshot(dataset)
+    if snapshot is not None:
+        transaction.on_commit(snapshot.mark_stale)
+
+
+@receiver(post_save, sender=Donation)
+@receiver(post_save, sender=DonationLog)
+def mark_snapshot_stale_on_update(sender, instance, created=False, raw=False, **kwargs):
+    # New rows are picked up by the high-water mark; edits need a reload
+    if not created and not raw:
+        _mark_snapshot_stale('donations' if sender is Donation else 'logs')
+
+
+@receiver(post_delete, sender=Donation)
+@receiver(post_delete, sender=DonationLog)
+def mark_snapshot_stale_on_delete(sender, **kwargs):
+    _mark_snapshot_stale('donations' if sender is Donation else 'logs')
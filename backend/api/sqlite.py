@@ -0,0 +1,165 @@
+"""
+SQLite connection tuning and write serialization.
+
+Every new SQLite connection gets the pragmas of the SQLITE_PROFILE
+setting, applied from api.signals. The 'production' profile switches the
+journal to WAL so readers no longer wait for writers, relaxes fsync to
+synchronous=NORMAL (safe with WAL: a power loss can drop the last commits
+but not corrupt the file), enlarges the page cache and memory maps the
+database file.
+
+SQLite still admits one writer at a time. A transaction that reads and
+then writes fails at once with "database is locked" when another writer
+committed first, whatever the busy timeout, so write-heavy code runs in
+``write_transaction``: writers take turns on an application lock, shared
+by every thread and (where fcntl exists) every process using the
+database, before their transaction begins.
+"""
+import os
+import threading
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: the lock is per process
+    fcntl = None
+
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        # Milliseconds to wait for a lock before raising "database is locked"
+        'busy_timeout': 5000,
+        # Negative sizes are KiB: a 64 MiB page cache per connection
+        'cache_size': -65536,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def sqlite_pragmas():
+    """Pragmas for new connections: the SQLITE_PROFILE plus SQLITE_PRAGMAS overrides."""
+    profile = getattr(settings, 'SQLITE_PROFILE', 'default')
+    return {**SQLITE_PROFILES[profile], **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+def apply_pragmas(cursor, pragmas):
+    """Run ``PRAGMA name = value`` for each entry on a DB-API cursor."""
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(connection):
+    """Apply sqlite_pragmas() to a newly opened Django SQLite connection."""
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, sqlite_pragmas())
+
+
+class WriteLock:
+    """
+    Re-entrant lock held by one thread of one process at a time.
+
+    Threads are serialized by an RLock. With a ``path`` and fcntl, an
+    exclusive flock on that file also serializes processes; the file is
+    reopened after a fork so parent and child do not share one lock.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+        self._pid = None
+
+    def _lock_file(self):
+        if self._file is None or self._pid != os.getpid():
+            self._file = open(self.path, 'a+b')
+            self._pid = os.getpid()
+        return self._file
+
+    def acquire(self):
+        self._lock.acquire()
+        try:
+            if self._depth == 0 and self.path and fcntl is not None:
+                fcntl.flock(self._lock_file(), fcntl.LOCK_EX)
+        except BaseException:
+            self._lock.release()
+            raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None and self._pid == os.getpid():
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+_write_locks = {}
+_write_locks_lock = threading.Lock()
+
+
+def get_write_lock(using=DEFAULT_DB_ALIAS):
+    """The process-wide WriteLock for a database alias, locking ``<NAME>-writelock``."""
+    lock = _write_locks.get(using)
+    if lock is None:
+        with _write_locks_lock:
+            lock = _write_locks.get(using)
+            if lock is None:
+                name = str(connections[using].settings_dict['NAME'])
+                in_memory = name == ':memory:' or 'mode=memory' in name
+                lock = _write_locks[using] = WriteLock(None if in_memory else f'{name}-writelock')
+    return lock
+
+
+class write_transaction(ContextDecorator):
+    """
+    ``transaction.atomic`` for write-heavy code paths, as a context manager
+    or a decorator (``@write_transaction()``).
+
+    On SQLite with SQLITE_WRITE_LOCK set, or with ``lock=True``, the
+    transaction begins only once the database's write lock is held, so
+    concurrent writers queue instead of failing. On other databases it is
+    a plain atomic block.
+    """
+
+    def __init__(self, using=None, lock=None):
+        self.using = using or DEFAULT_DB_ALIAS
+        self.lock = lock
+        self._lock = None
+        self._atomic = None
+
+    def _recreate_cm(self):
+        # A fresh instance per decorated call keeps concurrent calls apart
+        return type(self)(self.using, self.lock)
+
+    def __enter__(self):
+        lock = getattr(settings, 'SQLITE_WRITE_LOCK', False) if self.lock is None else self.lock
+        if connections[self.using].vendor == 'sqlite' and lock:
+            self._lock = get_write_lock(self.using)
+            self._lock.acquire()
+        self._atomic = transaction.atomic(using=self.using)
+        try:
+            self._atomic.__enter__()
+        except BaseException:
+            if self._lock is not None:
+                self._lock.release()
+            raise
+
+    def __exit__(self, *exc_info):
+        try:
+            return self._atomic.__exit__(*exc_info)
+        finally:
+            if self._lock is not None:
+                self._lock.release()
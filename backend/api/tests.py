@@ -0,0 +1,544 @@
+import json
+from datetime import date, datetime, timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import skipUnless
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import compatibility, directory_cache
+from api.allocation import plan_allocations
+from api.broadcasts import create_broadcast
+from api.calculator_pool import CALCULATOR_EXECUTABLE, CalculatorPool
+from api.calculator_wire import encode_request, pack_donations
+from api.models import (
+    BloodBank,
+    Broadcast,
+    Donation,
+    DonationHistory,
+    DonationLog,
+    DonationRequest,
+    Donor,
+    Inventory,
+    Location,
+    Notification,
+    UserProfile
+)
+from api.ingest import ingest_donations
+from api.matching import match_donors
+from api.medical_conditions import mask_for
+from api.query_budget import query_budget
+from api.sqlite import get_write_lock, write_transaction
+from api.utils import aggregate_blood_availability
+
+
+@skipUnless(CALCULATOR_EXECUTABLE.exists(), 'blood_calculator executable has not been built')
+class CompatibilityParityTests(TestCase):
+    """The in-process compatibility matrix must answer exactly like the binary."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pool = CalculatorPool(size=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        super().tearDownClass()
+
+    def test_every_pair_matches_the_binary(self):
+        groups = compatibility.BLOOD_GROUPS + ('XX', '')
+        for donor in groups:
+            for recipient in groups:
+                with self.subTest(donor=donor, recipient=recipient):
+                    actual = compatibility.check_compatibility(donor, recipient)
+                    request = {'operation': 'check_compatibility', 'donor': donor, 'recipient': recipient}
+                    if 'error' in actual:
+                        with self.assertRaisesMessage(RuntimeError, actual['error']):
+                            self.pool.run(request)
+                    else:
+                        self.assertEqual(self.pool.run(request), actual)
+
+
+@skipUnless(CALCULATOR_EXECUTABLE.exists(), 'blood_calculator executable has not been built')
+class CalculatorPoolTests(TestCase):
+    def test_null_response_is_returned_as_none(self):
+        pool = CalculatorPool(size=1)
+        try:
+            self.assertIsNone(pool.run({'operation': 'calculate_availability', 'donations': []}))
+        finally:
+            pool.shutdown()
+
+
+class CompatibilityBatchValidationTests(TestCase):
+    url = '/api/requests/check_compatibility_batch/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('staff', password='x'))
+
+    def test_rejects_non_object_body(self):
+        response = self.client.post(self.url, [1, 2], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_non_integer_request_ids(self):
+        for request_ids in ('12', ['1'], [1.5], [True], [None]):
+            with self.subTest(request_ids=request_ids):
+                response = self.client.post(
+                    self.url, {'donor_blood_groups': ['O-'], 'request_ids': request_ids}, format='json'
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_rejects_malformed_pairs(self):
+        for pairs in ('O-', [['O-', 1]], [{'donor_blood_group': 'O-', 'request_id': '1'}]):
+            with self.subTest(pairs=pairs):
+                response = self.client.post(self.url, {'pairs': pairs}, format='json')
+                self.assertEqual(response.status_code, 400)
+
+
+class BloodBankPaginationTests(TestCase):
+    url = '/api/bloodbanks/'
+
+    def test_pages_follow_name_order(self):
+        for name in ['Mercy', 'Central', 'Apollo', 'Central', 'Zenith']:
+            BloodBank.objects.create(name=name, address='-', timing='9-5', phone='100')
+
+        seen, url = [], f'{self.url}?page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            seen.extend(bank['name'] for bank in page['results'])
+            url = page['next']
+        self.assertEqual(seen, sorted(BloodBank.objects.values_list('name', flat=True)))
+
+    def test_max_page_size_follows_settings(self):
+        for i in range(5):
+            BloodBank.objects.create(name=f'Bank {i}', address='-', timing='9-5', phone='100')
+        with self.settings(API_MAX_PAGE_SIZE=3):
+            response = self.client.get(self.url, {'page_size': 100})
+        self.assertEqual(len(response.json()['results']), 3)
+
+    def test_async_pages_follow_name_order(self):
+        for name in ['Mercy', 'Central', 'Apollo', 'Central', 'Zenith']:
+            BloodBank.objects.create(name=name, address='-', timing='9-5', phone='100')
+
+        seen, params = [], {'page_size': 2}
+        while True:
+            page = self.client.get('/api/async/bloodbanks/', params).json()
+            seen.extend(bank['name'] for bank in page['results'])
+            if page['next_after'] is None:
+                break
+            params = {'page_size': 2, 'after_name': page['next_after_name'], 'after': page['next_after']}
+        self.assertEqual(seen, sorted(BloodBank.objects.values_list('name', flat=True)))
+
+
+class ListQueryBudgetTests(TestCase):
+    """
+    Each list endpoint runs a constant number of queries however many rows
+    it serializes, so a missing select_related shows up as a failure here.
+    """
+    ROWS = 1000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', password='x')
+        UserProfile.objects.create(user=cls.user, phone_number='+919876543210', date_of_birth='1990-01-01', gender='O')
+        donor = Donor.objects.create(user=cls.user, blood_group='O-', weight=70, height=170)
+        Location.objects.create(
+            donor=donor, latitude=15.36, longitude=75.12, address='-',
+            city='Hubli', state='Karnataka', country='India', postal_code='580020'
+        )
+
+        banks = BloodBank.objects.bulk_create(
+            BloodBank(name=f'Bank {i:04}', address='-', timing='9-5', phone='100') for i in range(cls.ROWS)
+        )
+        DonationRequest.objects.bulk_create(
+            DonationRequest(requester=cls.user, blood_bank=bank, blood_group='O-', units=1, reason='-')
+            for bank in banks
+        )
+        donations = Donation.objects.bulk_create(
+            Donation(donor=cls.user, blood_bank=bank, blood_group='O-', units=1, status='completed')
+            for bank in banks
+        )
+        DonationHistory.objects.bulk_create(
+            DonationHistory(
+                donor=donor, donation=donation, blood_volume=450, hemoglobin_level=14,
+                blood_pressure='120/80', pulse_rate=72, temperature=36.6
+            )
+            for donation in donations
+        )
+        broadcasts = Broadcast.objects.bulk_create(
+            Broadcast(created_by=cls.user, blood_group='O-', latitude=15.36, longitude=75.12,
+                      radius_km=10, message='-')
+            for _ in range(cls.ROWS)
+        )
+        Notification.objects.bulk_create(
+            Notification(donor=donor, broadcast=broadcast, channel='sms', body='-') for broadcast in broadcasts
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assert_list_within_budget(self, url, budget):
+        with query_budget(budget, label=f'GET {url}'):
+            response = self.client.get(url, {'page_size': 200})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_user_endpoints(self):
+        for url in ('/api/users/', '/api/profiles/', '/api/donors/', '/api/locations/'):
+            with self.subTest(url=url):
+                self.assertEqual(len(self.assert_list_within_budget(url, 1)), 1)
+
+    def test_row_endpoints(self):
+        for url in ('/api/requests/', '/api/donations/', '/api/history/', '/api/broadcasts/'):
+            with self.subTest(url=url):
+                self.assertEqual(len(self.assert_list_within_budget(url, 1)), 200)
+
+    def test_blood_bank_directory(self):
+        # The directory stamp behind Last-Modified/ETag, then the page
+        self.assertEqual(len(self.assert_list_within_budget('/api/bloodbanks/', 2)), 200)
+
+
+class NearbyExcludeConditionsTests(TestCase):
+    url = '/api/donors/nearby/'
+
+    def setUp(self):
+        for name, conditions in [('healthy', ''), ('asthmatic', 'asthma'), ('diabetic', 'Diabetes')]:
+            donor = Donor.objects.create(
+                user=User.objects.create_user(name, password='x'), blood_group='A+',
+                medical_conditions=conditions, weight=70, height=170
+            )
+            Location.objects.create(
+                donor=donor, latitude='12.970000', longitude='77.590000', address='-',
+                city='Bengaluru', state='KA', country='IN', postal_code='560001'
+            )
+
+    def nearby(self, exclude_conditions):
+        response = self.client.get(self.url, {
+            'latitude': 12.97, 'longitude': 77.59, 'radius': 5, 'exclude_conditions': exclude_conditions,
+        })
+        self.assertEqual(response.status_code, 200)
+        return sorted(donor['user']['username'] for donor in response.json())
+
+    def test_excludes_donors_with_listed_conditions(self):
+        for backend in ('orm', 'memory'):
+            with self.subTest(backend=backend), self.settings(DONOR_NEARBY_BACKEND=backend):
+                self.assertEqual(self.nearby('asthma'), ['diabetic', 'healthy'])
+                self.assertEqual(self.nearby('all'), ['healthy'])
+
+    def test_rejects_unknown_conditions(self):
+        response = self.client.get(self.url, {'latitude': 12.97, 'longitude': 77.59, 'exclude_conditions': 'gout'})
+        self.assertEqual(response.status_code, 400)
+
+
+class MatchDonorsTests(TestCase):
+    def add_donor(self, name, blood_group):
+        donor = Donor.objects.create(
+            user=User.objects.create_user(name, password='x'), blood_group=blood_group, weight=70, height=170
+        )
+        Location.objects.create(
+            donor=donor, latitude='12.970000', longitude='77.590000', address='-',
+            city='Bengaluru', state='KA', country='IN', postal_code='560001'
+        )
+
+    def test_scarce_groups_rank_below_plentiful_ones(self):
+        for i in range(3):
+            self.add_donor(f'o_pos{i}', 'O+')
+        self.add_donor('a_pos', 'A+')
+        self.add_donor('o_neg', 'O-')
+
+        matches = match_donors('A+', 12.97, 77.59, 5, limit=10)
+
+        self.assertEqual([group for _, _, group, _ in matches], ['A+', 'O+', 'O+', 'O+', 'O-'])
+
+
+class AllocationPlanTests(TestCase):
+    def test_exact_stock_is_spent_before_substitutes(self):
+        plans = plan_allocations(
+            [(1, 10, 'A+', 3), (2, 10, 'A-', 2)],
+            {(10, 'A+'): 1, (20, 'A+'): 1, (10, 'A-'): 3, (10, 'O-'): 5}
+        )
+
+        self.assertEqual(
+            [(a['blood_bank'], a['blood_group'], a['units']) for a in plans[0]['allocations']],
+            [(10, 'A+', 1), (20, 'A+', 1), (10, 'A-', 1)]
+        )
+        self.assertEqual([(a['blood_group'], a['units']) for a in plans[1]['allocations']], [('A-', 2)])
+        self.assertEqual([plan['shortfall'] for plan in plans], [0, 0])
+
+
+class DonorContactTests(TestCase):
+    def setUp(self):
+        self.donor = Donor.objects.create(
+            user=User.objects.create_user('donor', password='x'), blood_group='A+', weight=70, height=170
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('requester', password='x'))
+        self.url = f'/api/donors/{self.donor.id}/contact/'
+
+    def test_queues_a_message_to_another_users_donor(self):
+        response = self.client.post(self.url, {'channel': 'sms', 'message': ' Can you help? '}, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        notification = Notification.objects.get(pk=response.json()['notification'])
+        self.assertEqual((notification.donor_id, notification.channel, notification.body),
+                         (self.donor.id, 'sms', 'Can you help?'))
+
+    def test_rejects_invalid_bodies(self):
+        for body in (['sms'], {'channel': 'fax'}):
+            with self.subTest(body=body):
+                self.assertEqual(self.client.post(self.url, body, format='json').status_code, 400)
+        self.assertFalse(Notification.objects.exists())
+
+
+class BroadcastTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', password='x')
+        self.donors = []
+        for i in range(3):
+            donor = Donor.objects.create(
+                user=User.objects.create_user(f'donor{i}', password='x'), blood_group='O-', weight=70, height=170
+            )
+            Location.objects.create(
+                donor=donor, latitude='12.970000', longitude='77.590000', address='-',
+                city='Bengaluru', state='KA', country='IN', postal_code='560001'
+            )
+            self.donors.append(donor)
+
+    def broadcast(self):
+        return create_broadcast(self.admin, 'A+', 12.97, 77.59, 5, 'Urgent: A+ needed')
+
+    def test_queued_rows_round_trip_through_the_orm(self):
+        broadcast = self.broadcast()
+
+        notifications = list(Notification.objects.filter(broadcast=broadcast).order_by('donor_id'))
+        self.assertEqual([n.donor_id for n in notifications], [donor.id for donor in self.donors])
+        for notification in notifications:
+            self.assertEqual(
+                (notification.sender_id, notification.channel, notification.body, notification.status,
+                 notification.attempts, notification.locked_by, notification.sent_at),
+                (self.admin.id, 'sms', 'Urgent: A+ needed', 'pending', 0, '', None)
+            )
+            self.assertIsNotNone(notification.created_at)
+            self.assertLessEqual(notification.next_attempt_at, timezone.now())
+
+    def test_write_transaction_lock_overrides_the_setting(self):
+        with self.settings(SQLITE_WRITE_LOCK=False):
+            with write_transaction():
+                self.assertEqual(get_write_lock()._depth, 0)
+            with write_transaction(lock=True):
+                self.assertEqual(get_write_lock()._depth, 1)
+
+    def test_skips_donors_reached_unless_the_message_failed(self):
+        first = self.broadcast()
+        Notification.objects.filter(broadcast=first, donor=self.donors[0]).update(status='failed')
+
+        second = self.broadcast()
+
+        self.assertEqual((second.recipient_count, second.duplicate_count), (1, 2))
+        self.assertEqual(list(second.notifications.values_list('donor_id', flat=True)), [self.donors[0].id])
+
+
+class BloodAvailabilityTests(TestCase):
+    def test_available_counts_completed_units_against_uncancelled_units(self):
+        user = User.objects.create_user('donor', password='x')
+        bank = BloodBank.objects.create(name='Central', address='-', timing='9-5', phone='100')
+        for blood_group, units, donation_status in [
+            ('A+', 3, 'completed'), ('A+', 1, 'scheduled'), ('A+', 1, 'cancelled'), ('O-', 2, 'scheduled'),
+        ]:
+            Donation.objects.create(
+                donor=user, blood_bank=bank, blood_group=blood_group, units=units, status=donation_status
+            )
+
+        availability = aggregate_blood_availability(Donation.objects.filter(blood_bank=bank))
+
+        self.assertEqual(availability, {'A+': {'available': 3, 'total': 4, 'utilization': 0.75}})
+
+
+class BloodBankDirectoryCacheTests(TestCase):
+    url = '/api/bloodbanks/'
+
+    def setUp(self):
+        cache.clear()
+
+    def test_deleting_a_bank_moves_last_modified(self):
+        long_ago = timezone.make_aware(datetime(2020, 1, 1))
+        banks = [
+            BloodBank.objects.create(name=name, address='-', timing='9-5', phone='100')
+            for name in ('Apollo', 'Central')
+        ]
+        BloodBank.objects.update(updated_at=long_ago)
+        cache.set(directory_cache.DELETED_KEY, long_ago, None)
+
+        last_modified = self.client.get(self.url)['Last-Modified']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        banks[0].delete()
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Apollo', [bank['name'] for bank in response.json()['results']])
+
+
+class ExportRecordsCommandTests(TestCase):
+    def test_writes_through_command_stdout(self):
+        user = User.objects.create_user('donor', password='x')
+        bank = BloodBank.objects.create(name='Central', address='-', timing='9-5', phone='100')
+        Donation.objects.create(donor=user, blood_bank=bank, blood_group='A+', units=2, status='completed')
+
+        out = StringIO()
+        call_command('export_records', 'donations', stdout=out)
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([(row['blood_group'], row['units']) for row in rows], [('A+', 2)])
+
+
+class IngestDonationsTests(TestCase):
+    def test_completed_rows_log_stock_and_update_donor_eligibility(self):
+        bank = BloodBank.objects.create(name='Central', address='-', timing='9-5', phone='100')
+        users = [User.objects.create_user(f'donor{i}', password='x') for i in range(3)]
+        donors = [Donor.objects.create(user=user, blood_group='A+', weight=70, height=170) for user in users]
+
+        created, errors = ingest_donations([
+            {'donor': users[0].id, 'blood_bank': bank.id, 'blood_group': 'A+', 'units': 2},
+            {'donor': users[1].id, 'blood_bank': bank.id, 'blood_group': 'A+', 'units': 1, 'status': 'scheduled'},
+            {'donor': users[2].id, 'blood_bank': bank.id, 'blood_group': 'A+', 'units': 1, 'status': 'cancelled'},
+        ])
+
+        self.assertEqual((created, errors), (3, []))
+        self.assertEqual(list(DonationLog.objects.values_list('units', 'log_type')), [(2, 'in')])
+        self.assertEqual(Inventory.objects.get(blood_bank=bank, blood_group='A+').units, 2)
+
+        today = timezone.localdate()
+        for donor in donors:
+            donor.refresh_from_db()
+        self.assertEqual(donors[0].last_donation, today)
+        self.assertEqual(donors[0].next_eligible_date, today + timedelta(days=settings.DONATION_DEFERRAL_DAYS))
+        self.assertIsNone(donors[1].last_donation)
+        self.assertIsNone(donors[2].last_donation)
+
+
+class DonationCompletionTests(TestCase):
+    def test_completing_a_scheduled_donation_adds_its_units_to_inventory(self):
+        bank = BloodBank.objects.create(name='Central', address='-', timing='9-5', phone='100')
+        user = User.objects.create_user('donor', password='x')
+        ingest_donations([
+            {'donor': user.id, 'blood_bank': bank.id, 'blood_group': 'B+', 'units': 2, 'status': 'scheduled'},
+        ])
+        self.assertFalse(Inventory.objects.filter(blood_bank=bank, blood_group='B+').exists())
+
+        client = APIClient()
+        client.force_authenticate(user)
+        donation = Donation.objects.get(donor=user)
+        self.assertEqual(client.post(f'/api/donations/{donation.id}/complete/').status_code, 200)
+
+        self.assertEqual(Inventory.objects.get(blood_bank=bank, blood_group='B+').units, 2)
+        self.assertEqual(list(DonationLog.objects.values_list('units', 'log_type')), [(2, 'in')])
+
+
+class BulkDonationUploadTests(TestCase):
+    url = '/api/donations/bulk/'
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_requires_an_admin(self):
+        self.client.force_authenticate(User.objects.create_user('donor', password='x'))
+        self.assertEqual(self.client.post(self.url, {'donations': []}, format='json').status_code, 403)
+
+    def test_rejects_a_list_body(self):
+        self.client.force_authenticate(User.objects.create_superuser('admin', password='x'))
+        self.assertEqual(self.client.post(self.url, [{'units': 1}], format='json').status_code, 400)
+
+
+class CalculatorWireTests(TestCase):
+    def test_non_numeric_units_fall_back_to_json(self):
+        request = {
+            'operation': 'calculate_availability',
+            'donations': [{'blood_group': 'A+', 'units': '3', 'is_available': True}],
+        }
+        line, payload = encode_request(request, ('json', 'packed'))
+        self.assertEqual((json.loads(line), payload), (request, b''))
+
+    def test_numeric_units_are_packed(self):
+        request = {
+            'operation': 'calculate_availability',
+            'donations': [{'blood_group': 'A+', 'units': 3, 'is_available': True}],
+        }
+        line, payload = encode_request(request, ('json', 'packed'))
+        self.assertEqual(json.loads(line)['encoding'], 'packed')
+        self.assertEqual(payload, pack_donations(request['donations']))
+
+
+class DataMigrationTests(TestCase):
+    def setUp(self):
+        self.donor = Donor.objects.create(
+            user=User.objects.create_user('donor', password='x'), blood_group='A+',
+            last_donation=date(2024, 1, 1), medical_conditions='Asthma, high BP', weight=70, height=170
+        )
+        Donor.objects.update(next_eligible_date=None, medical_conditions_mask=0)
+
+    def test_fill_next_eligible_date(self):
+        import_module('api.migrations.0010_donor_next_eligible_date').fill_next_eligible_date(apps, None)
+
+        self.donor.refresh_from_db()
+        self.assertEqual(
+            self.donor.next_eligible_date, date(2024, 1, 1) + timedelta(days=settings.DONATION_DEFERRAL_DAYS)
+        )
+
+    def test_fill_conditions_mask(self):
+        import_module('api.migrations.0011_donor_medical_conditions_mask').fill_conditions_mask(apps, None)
+
+        self.donor.refresh_from_db()
+        self.assertEqual(self.donor.medical_conditions_mask, mask_for(['asthma', 'hypertension']))
+
+
+class LegacyRowsMigrationTests(TransactionTestCase):
+    before = [('api', '0013_broadcast')]
+    after = [('api', '0015_remove_legacy_request_fields')]
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_convert_legacy_rows(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        old = executor.loader.project_state(self.before).apps
+
+        user = old.get_model('auth', 'User').objects.create(username='donor')
+        requester = old.get_model('auth', 'User').objects.create(username='requester')
+        bank = old.get_model('api', 'BloodBank').objects.create(name='Central', address='-', timing='9-5', phone='100')
+        first_bank = old.get_model('api', 'BloodBank').objects.order_by('pk').first().pk
+        donor = old.get_model('api', 'Donor').objects.create(user=user, blood_group='A+', weight=70, height=170)
+        request = old.get_model('api', 'DonationRequest').objects.create(
+            requester=requester, blood_group='A+', units_needed=2, urgency_level='HIGH',
+            hospital_name='City Hospital', hospital_address='Main St', required_date=date(2024, 1, 2),
+            status='ACCEPTED'
+        )
+        old.get_model('api', 'Donation').objects.create(
+            request=request, donor=donor, blood_bank=bank, blood_group='A+',
+            scheduled_date=timezone.now(), status='COMPLETED'
+        )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        new = executor.loader.project_state(self.after).apps
+
+        self.assertEqual(
+            list(new.get_model('api', 'DonationRequest').objects.values_list('blood_bank', 'units', 'status', 'reason')),
+            [(first_bank, 2, 'approved', 'City Hospital, Main St')]
+        )
+        self.assertEqual(
+            list(new.get_model('api', 'Donation').objects.values_list('donor', 'units', 'status')),
+            [(user.pk, 1, 'completed')]
+        )
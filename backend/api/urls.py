@@ -4,6 +4,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from . import async_views
 from .views import (
     UserViewSet,
     UserProfileViewSet,
@@ -13,7 +14,9 @@ from .views import (
     DonationViewSet,
     DonationHistoryViewSet,
     RegisterView,
-    BloodBankViewSet
+    BloodBankViewSet,
+    BroadcastViewSet,
+    export_records
 )
 
 router = DefaultRouter()
@@ -26,9 +29,16 @@ router.register(r'donations', DonationViewSet, basename='donation')
 router.register(r'history', DonationHistoryViewSet, basename='history')
 router.register(r'register', RegisterView, basename='register')
 router.register(r'bloodbanks', BloodBankViewSet, basename='bloodbank')
+router.register(r'broadcasts', BroadcastViewSet, basename='broadcast')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('export/<str:dataset>/', export_records, name='export_records'),
+    # Async read endpoints, for deployments served under ASGI
+    path('async/bloodbanks/', async_views.blood_bank_list, name='async_bloodbank_list'),
+    path('async/bloodbanks/<int:pk>/availability/', async_views.blood_bank_availability, name='async_bloodbank_availability'),
+    path('async/donors/nearby/', async_views.nearby_donors, name='async_donor_nearby'),
+    path('async/compatibility/', async_views.compatibility_check, name='async_compatibility'),
 ] 
\ No newline at end of file
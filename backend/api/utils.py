@@ -1,7 +1,10 @@
 import json
-import subprocess
-import os
-from pathlib import Path
+from django.db.models import F, Q, Sum, FloatField, ExpressionWrapper
+from django.db.models.functions import Radians, Cos, Sin, ATan2, Sqrt
+from . import compatibility
+from .calculator_pool import get_calculator_pool
+from .geo import EARTH_RADIUS_KM, bounding_box
+from .models import Donor
 
 def run_blood_calculator(input_data):
     """
@@ -13,30 +16,9 @@ def run_blood_calculator(input_data):
     Returns:
         dict: The result from the C++ program
     """
-    # Get the path to the C++ executable
-    cpp_dir = Path(__file__).parent.parent / 'cpp'
-    executable = cpp_dir / 'build' / 'blood_calculator'
-    
-    if not executable.exists():
-        raise FileNotFoundError(f"Blood calculator executable not found at {executable}")
-    
-    # Convert input data to JSON string
-    input_json = json.dumps(input_data)
-    
     try:
-        # Run the C++ program
-        result = subprocess.run(
-            [str(executable)],
-            input=input_json.encode(),
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Parse the output
-        return json.loads(result.stdout)
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Blood calculator failed: {e.stderr}")
+        # Reuse a long-lived worker from the shared pool
+        return get_calculator_pool().run(input_data)
     except json.JSONDecodeError as e:
         raise RuntimeError(f"Failed to parse blood calculator output: {e}")
 
@@ -51,13 +33,7 @@ def check_blood_compatibility(donor_blood_group, recipient_blood_group):
     Returns:
         bool: True if compatible, False otherwise
     """
-    input_data = {
-        "operation": "check_compatibility",
-        "donor": donor_blood_group,
-        "recipient": recipient_blood_group
-    }
-    
-    result = run_blood_calculator(input_data)
+    result = compatibility.check_compatibility(donor_blood_group, recipient_blood_group)
     return result["compatible"]
 
 def calculate_blood_availability(donations):
@@ -75,4 +51,151 @@ def calculate_blood_availability(donations):
         "donations": donations
     }
     
-    return run_blood_calculator(input_data) 
\ No newline at end of file
+    return run_blood_calculator(input_data)
+
+
+def _availability_totals(donations):
+    # IN on status keeps the (blood_bank, status, blood_group) index in play
+    return (
+        donations.filter(status__in=('completed', 'scheduled'))
+        .order_by()
+        .values('blood_group')
+        .annotate(
+            total=Sum('units'),
+            available=Sum('units', filter=Q(status='completed'))
+        )
+        .values_list('blood_group', 'available', 'total')
+    )
+
+
+def _format_availability(totals):
+    availability = {}
+    for blood_group, available, total in totals:
+        # Like the calculator, list only groups with available stock rows
+        if available is None:
+            continue
+        availability[blood_group] = {
+            'available': available,
+            'total': total,
+            'utilization': available / total if total else 0.0
+        }
+    return availability
+
+
+def aggregate_blood_availability(donations):
+    """
+    Calculate available blood units per blood group inside the database.
+    
+    Returns the same shape as calculate_blood_availability but runs a
+    single GROUP BY blood_group aggregate instead of shipping every row
+    to the C++ program. Completed donations are available stock; total
+    adds the scheduled ones. Cancelled donations were never stock and
+    count toward neither.
+    
+    Args:
+        donations (QuerySet): A bank's donation rows, of any status
+        
+    Returns:
+        dict: Available, total and utilization for each blood group
+    """
+    return _format_availability(_availability_totals(donations))
+
+
+async def aaggregate_blood_availability(donations):
+    """
+    Async version of aggregate_blood_availability using the async ORM.
+    """
+    return _format_availability([row async for row in _availability_totals(donations)])
+
+
+def parse_nearby_params(params):
+    """
+    Parse the query parameters of a nearby donor search.
+    
+    Args:
+        params (QueryDict): latitude, longitude and optional radius (km),
+            limit, blood_group and is_available
+        
+    Returns:
+        dict: Parsed parameters, ready for nearby_donor_queryset
+        
+    Raises:
+        ValueError: If a parameter is missing or out of range
+    """
+    try:
+        latitude = float(params.get('latitude'))
+        longitude = float(params.get('longitude'))
+        radius_km = float(params.get('radius', 10))
+        limit = params.get('limit')
+        limit = int(limit) if limit is not None else None
+    except (TypeError, ValueError):
+        raise ValueError("Invalid parameters")
+    
+    if radius_km < 0 or (limit is not None and limit < 1):
+        raise ValueError("Invalid parameters")
+    
+    is_available = params.get('is_available')
+    if is_available is not None:
+        is_available = is_available.lower() in ('true', '1')
+    
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'radius_km': radius_km,
+        'limit': limit,
+        'blood_group': params.get('blood_group') or None,
+        'is_available': is_available,
+    }
+
+def nearby_donor_queryset(latitude, longitude, radius_km, blood_group=None, is_available=None, donors=None):
+    """
+    Build the queryset of donors within ``radius_km`` of a point, nearest first.
+    
+    Candidates are narrowed with the indexed latitude/longitude bounding
+    box before the Haversine distance is evaluated, so only donors inside
+    the box pay for the trigonometry.
+    
+    Args:
+        latitude (float): Search origin latitude
+        longitude (float): Search origin longitude
+        radius_km (float): Search radius in kilometers
+        blood_group (str, optional): Only donors of this blood group
+        is_available (bool, optional): Only donors with this availability
+        donors (QuerySet, optional): Donors to search instead of all of them
+        
+    Returns:
+        QuerySet: Donors annotated with ``distance`` in kilometers
+    """
+    min_lat, max_lat, lon_ranges = bounding_box(latitude, longitude, radius_km)
+    in_box = Q()
+    for min_lon, max_lon in lon_ranges:
+        in_box |= Q(location__longitude__range=(min_lon, max_lon))
+    
+    candidates = (Donor.objects.all() if donors is None else donors).filter(
+        in_box,
+        location__latitude__range=(min_lat, max_lat)
+    )
+    
+    if blood_group:
+        candidates = candidates.filter(blood_group=blood_group)
+    if is_available is not None:
+        candidates = candidates.filter(is_available=is_available)
+    
+    # Convert to radians
+    lat1 = Radians(latitude)
+    lon1 = Radians(longitude)
+    lat2 = Radians(F('location__latitude'))
+    lon2 = Radians(F('location__longitude'))
+    
+    # Haversine formula
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = Sin(dlat/2)**2 + Cos(lat1) * Cos(lat2) * Sin(dlon/2)**2
+    c = 2 * ATan2(Sqrt(a), Sqrt(1-a))
+    distance = EARTH_RADIUS_KM * c
+    
+    return candidates.annotate(
+        distance=ExpressionWrapper(distance, output_field=FloatField())
+    ).filter(
+        distance__lte=radius_km
+    ).order_by('distance')
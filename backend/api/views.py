@@ -1,9 +1,15 @@
-from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import action, api_view
+from rest_framework import mixins, viewsets, status, permissions
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import F, FloatField, ExpressionWrapper
-from django.db.models.functions import Radians, Cos, Sin, ATan2, Sqrt
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django_filters import rest_framework as filters
 from .models import (
     UserProfile,
@@ -13,21 +19,61 @@ from .models import (
     Donation,
     DonationHistory,
     BloodBank,
-    DonationLog
+    DonationLog,
+    Inventory,
+    Broadcast
 )
 from .serializers import (
     UserSerializer,
     UserProfileSerializer,
     DonorSerializer,
+    DonorContactSerializer,
     LocationSerializer,
     DonationRequestSerializer,
     DonationSerializer,
     DonationHistorySerializer,
     UserRegistrationSerializer,
     BloodBankSerializer,
-    DonationLogSerializer
+    DonationLogSerializer,
+    InventorySerializer,
+    BroadcastSerializer
 )
-from .utils import check_blood_compatibility, calculate_blood_availability
+from . import compatibility, directory_cache, exports
+from .allocation import build_allocation_plan
+from .broadcasts import create_broadcast, with_progress
+from .donation_snapshot import ROLLUP_DIMENSIONS, SNAPSHOT_DATASETS, get_donation_snapshot
+from .donor_locator import get_donor_locator
+from .eligibility import eligible_donors
+from .forecasting import days_of_supply, get_demand_forecaster
+from .ingest import ingest_donations
+from .matching import match_donors
+from .medical_conditions import exclude_conditions
+from .notifications import enqueue_notification
+from .pagination import NameCursorPagination
+from .rollups import TREND_PERIODS, inventory_trend
+from .sqlite import write_transaction
+from .utils import (
+    check_blood_compatibility,
+    aggregate_blood_availability,
+    nearby_donor_queryset,
+    parse_nearby_params
+)
+
+# Upper bound on donor groups or request IDs in one batch compatibility call
+MAX_COMPATIBILITY_BATCH = 1000
+
+# Most donors returned by one DonationRequest match
+MAX_MATCH_LIMIT = 100
+
+# Longest days-of-supply projection, in days
+MAX_FORECAST_HORIZON = 90
+
+# Widest emergency broadcast, in km
+MAX_BROADCAST_RADIUS_KM = 200
+
+def _is_id(value):
+    """True for a JSON integer; bools are ints in Python but not IDs."""
+    return isinstance(value, int) and not isinstance(value, bool)
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
@@ -43,7 +89,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return UserProfile.objects.filter(user=self.request.user)
+        return UserProfile.objects.filter(user=self.request.user).select_related('user')
 
 class DonorViewSet(viewsets.ModelViewSet):
     queryset = Donor.objects.all()
@@ -53,60 +99,99 @@ class DonorViewSet(viewsets.ModelViewSet):
     filterset_fields = ['blood_group', 'is_available']
 
     def get_queryset(self):
-        return Donor.objects.filter(user=self.request.user)
+        return Donor.objects.filter(user=self.request.user).select_related('user', 'location')
 
     @action(detail=False, methods=['get'])
     def nearby(self, request):
         try:
-            latitude = float(request.query_params.get('latitude'))
-            longitude = float(request.query_params.get('longitude'))
-            radius_km = float(request.query_params.get('radius', 10))
-        except (TypeError, ValueError):
+            params = parse_nearby_params(request.query_params)
+        except ValueError:
             return Response(
                 {'error': 'Invalid parameters'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Haversine formula for distance calculation
-        R = 6371  # Earth's radius in kilometers
-
-        # Convert to radians
-        lat1 = Radians(latitude)
-        lon1 = Radians(longitude)
-        lat2 = Radians(F('location__latitude'))
-        lon2 = Radians(F('location__longitude'))
+        limit = params.pop('limit')
+        donors = Donor.objects.select_related('user', 'location')
+        excluded = request.query_params.get('exclude_conditions')
+        if excluded:
+            try:
+                donors = exclude_conditions(donors, excluded)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if settings.DONOR_NEARBY_BACKEND == 'memory':
+            # The locator has no conditions; with exclusions, rank every
+            # donor in range and let the database drop the excluded ones
+            matches = get_donor_locator().within_radius(
+                params['latitude'], params['longitude'], params['radius_km'],
+                blood_groups=[params['blood_group']] if params['blood_group'] else None,
+                is_available=params['is_available'],
+                limit=None if excluded else limit
+            )
+            found = donors.in_bulk([donor_id for donor_id, _ in matches])
+            nearby_donors = [found[donor_id] for donor_id, _ in matches if donor_id in found][:limit]
+            serializer = self.get_serializer(nearby_donors, many=True)
+            return Response(serializer.data)
 
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = Sin(dlat/2)**2 + Cos(lat1) * Cos(lat2) * Sin(dlon/2)**2
-        c = 2 * ATan2(Sqrt(a), Sqrt(1-a))
-        distance = R * c
+        nearby_donors = nearby_donor_queryset(**params, donors=donors)
 
-        # Filter donors within radius
-        nearby_donors = Donor.objects.annotate(
-            distance=ExpressionWrapper(distance, output_field=FloatField())
-        ).filter(
-            location__isnull=False,
-            distance__lte=radius_km
-        ).order_by('distance')
+        if limit is not None:
+            nearby_donors = nearby_donors[:limit]
 
         serializer = self.get_serializer(nearby_donors, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def eligible(self, request):
+        day = request.query_params.get('date')
+        if day:
+            day = parse_date(day)
+            if day is None:
+                return Response(
+                    {'error': 'date must be an ISO date'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        donors = eligible_donors(
+            blood_groups=request.query_params.getlist('blood_group'),
+            on=day
+        ).select_related('user', 'location')
+
+        excluded = request.query_params.get('exclude_conditions')
+        if excluded:
+            try:
+                donors = exclude_conditions(donors, excluded)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        page = self.paginate_queryset(donors)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['post'])
     def contact(self, request, pk=None):
-        donor = self.get_object()
-        try:
-            # Here you would typically implement the contact logic
-            # For example, sending an email or notification
-            return Response({
-                'message': f'Contact request sent to {donor.user.get_full_name()}'
-            }, status=status.HTTP_200_OK)
-        except Exception as e:
-            return Response({
-                'error': str(e)
-            }, status=status.HTTP_400_BAD_REQUEST)
+        """Queue a message to the donor; send_notifications delivers it."""
+        # get_object() only sees the caller's own donor record
+        donor = get_object_or_404(Donor.objects.select_related('user'), pk=pk)
+        self.check_object_permissions(request, donor)
+
+        serializer = DonorContactSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        channel = serializer.validated_data['channel']
+        message = serializer.validated_data['message']
+        if not message:
+            sender_name = request.user.get_full_name() or request.user.username
+            message = f'{sender_name} would like to contact you about a blood donation.'
+
+        notification = enqueue_notification(
+            donor, message, subject='Blood donation request', channel=channel, sender=request.user
+        )
+        return Response({
+            'message': f'Contact request queued for {donor.user.get_full_name()}',
+            'notification': notification.id,
+            'status': notification.status,
+        }, status=status.HTTP_202_ACCEPTED)
 
 class LocationViewSet(viewsets.ModelViewSet):
     queryset = Location.objects.all()
@@ -121,10 +206,12 @@ class DonationRequestViewSet(viewsets.ModelViewSet):
     serializer_class = DonationRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = (filters.DjangoFilterBackend,)
-    filterset_fields = ['blood_group', 'urgency_level', 'status']
+    filterset_fields = ['blood_group', 'status']
 
     def get_queryset(self):
-        return DonationRequest.objects.filter(requester=self.request.user)
+        return DonationRequest.objects.filter(
+            requester=self.request.user
+        ).select_related('requester', 'blood_bank')
 
     def perform_create(self, serializer):
         serializer.save(requester=self.request.user)
@@ -152,6 +239,188 @@ class DonationRequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['get'])
+    def match(self, request, pk=None):
+        donation_request = self.get_object()
+        try:
+            params = parse_nearby_params(request.query_params)
+        except ValueError:
+            return Response(
+                {'error': 'latitude and longitude are required; radius and limit must be positive'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(params['limit'] or 10, MAX_MATCH_LIMIT)
+
+        try:
+            matches = match_donors(
+                donation_request.blood_group,
+                params['latitude'],
+                params['longitude'],
+                params['radius_km'],
+                limit=limit,
+                exclude_user=donation_request.requester,
+                excluded_conditions=request.query_params.get('exclude_conditions')
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        donors = Donor.objects.select_related('user', 'location').in_bulk(
+            [donor_id for _, donor_id, _, _ in matches]
+        )
+        return Response({
+            'request': donation_request.id,
+            'recipient_blood_group': donation_request.blood_group,
+            'compatible_donor_groups': compatibility.compatible_donor_groups(donation_request.blood_group),
+            'results': [
+                {
+                    'score': round(score, 4),
+                    'distance_km': round(distance, 2),
+                    'exact_match': blood_group == donation_request.blood_group,
+                    'donor': DonorSerializer(donors[donor_id]).data,
+                }
+                for score, donor_id, blood_group, distance in matches
+                if donor_id in donors
+            ],
+        })
+
+    @action(detail=False, methods=['get'], url_path='allocation-plan', permission_classes=[permissions.IsAdminUser])
+    def allocation_plan(self, request):
+        """
+        Propose how current inventory covers every pending request, oldest
+        first; nothing is reserved or moved.
+        """
+        return Response(build_allocation_plan())
+
+    @action(detail=False, methods=['post'])
+    def check_compatibility_batch(self, request):
+        """
+        Check many donor groups against many requests in one call.
+
+        Accepts either ``donor_blood_groups`` + ``request_ids`` (returns the
+        full grid, one row per donor group) or a list of explicit ``pairs``
+        of ``donor_blood_group``/``request_id``.
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {'error': 'Request body must be a JSON object'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        pairs = request.data.get('pairs')
+        if pairs is not None:
+            if not isinstance(pairs, list) or not all(
+                isinstance(pair, dict) and 'donor_blood_group' in pair and _is_id(pair.get('request_id'))
+                for pair in pairs
+            ):
+                return Response(
+                    {'error': 'Each pair needs a donor_blood_group and an integer request_id'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            donor_groups = [pair['donor_blood_group'] for pair in pairs]
+            request_ids = [pair['request_id'] for pair in pairs]
+        else:
+            donor_groups = request.data.get('donor_blood_groups')
+            request_ids = request.data.get('request_ids')
+            if (not isinstance(donor_groups, list) or not donor_groups
+                    or not isinstance(request_ids, list) or not request_ids):
+                return Response(
+                    {'error': 'donor_blood_groups and request_ids are required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not all(_is_id(pk) for pk in request_ids):
+                return Response(
+                    {'error': 'request_ids must be a list of integers'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        if max(len(donor_groups), len(request_ids)) > MAX_COMPATIBILITY_BATCH:
+            return Response(
+                {'error': f'At most {MAX_COMPATIBILITY_BATCH} items per batch'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not all(isinstance(group, str) for group in donor_groups):
+            return Response(
+                {'error': 'Donor blood groups must be strings'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        donor_codes = compatibility.encode_blood_groups(donor_groups)
+        invalid = sorted({g for g, code in zip(donor_groups, donor_codes) if code == compatibility.INVALID_CODE})
+        if invalid:
+            return Response(
+                {'error': 'Invalid blood group', 'invalid_blood_groups': invalid},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Load every referenced request in a single query
+        recipient_groups = dict(
+            self.get_queryset().filter(id__in=set(request_ids)).values_list('id', 'blood_group')
+        )
+        missing = sorted(set(request_ids) - recipient_groups.keys())
+        if missing:
+            return Response(
+                {'error': 'Donation requests not found', 'missing_request_ids': missing},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        recipient_codes = compatibility.encode_blood_groups(recipient_groups[pk] for pk in request_ids)
+        if pairs is not None:
+            results = compatibility.is_compatible_codes(donor_codes, recipient_codes)
+            return Response({
+                'results': [
+                    {'donor_blood_group': group, 'request_id': pk, 'compatible': compatible}
+                    for group, pk, compatible in zip(donor_groups, request_ids, results)
+                ]
+            })
+
+        return Response({
+            'donor_blood_groups': donor_groups,
+            'request_ids': request_ids,
+            'compatibility': compatibility.compatibility_grid(donor_codes, recipient_codes)
+        })
+
+class BroadcastViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                       mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Emergency broadcasts. POST queues a message for every eligible donor
+    compatible with blood_group within radius_km; GET reports delivery
+    progress from the outbox.
+    """
+    queryset = Broadcast.objects.all()
+    serializer_class = BroadcastSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        return with_progress(Broadcast.objects.all())
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if data['radius_km'] > MAX_BROADCAST_RADIUS_KM:
+            return Response(
+                {'error': f'radius_km must be at most {MAX_BROADCAST_RADIUS_KM}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            broadcast = create_broadcast(request.user, **data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(self.get_queryset().get(pk=broadcast.pk))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+def _log_donation(donation):
+    """Log a completed donation's units as 'in'; the inventory is updated by signal."""
+    DonationLog.objects.create(
+        blood_bank=donation.blood_bank,
+        blood_group=donation.blood_group,
+        units=donation.units,
+        log_type='in'
+    )
+
 class DonationViewSet(viewsets.ModelViewSet):
     queryset = Donation.objects.all()
     serializer_class = DonationSerializer
@@ -160,35 +429,105 @@ class DonationViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status']
 
     def get_queryset(self):
-        return Donation.objects.filter(donor__user=self.request.user)
+        return Donation.objects.filter(
+            donor=self.request.user
+        ).select_related('donor', 'blood_bank')
 
+    @write_transaction()
     def perform_create(self, serializer):
         donation = serializer.save()
-        
-        # Create a donation log entry
-        DonationLog.objects.create(
-            blood_bank=donation.blood_bank,
-            blood_group=donation.blood_group,
-            units=donation.units,
-            log_type='in'
+
+        # Only completed units are stock; scheduled ones are logged by complete()
+        if donation.status == 'completed':
+            _log_donation(donation)
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def bulk(self, request):
+        if not isinstance(request.data, dict):
+            return Response(
+                {'error': 'Request body must be a JSON object'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = request.data.get('donations')
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {'error': 'donations must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if len(rows) > settings.BULK_INGEST_MAX_ROWS:
+            return Response(
+                {'error': f'At most {settings.BULK_INGEST_MAX_ROWS} donations per upload'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        created, errors = ingest_donations(rows)
+        return Response(
+            {'created': created, 'errors': errors},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
         )
 
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def analytics(self, request):
+        """
+        Roll up donations or donation logs from the in-memory snapshot,
+        e.g. ``?dataset=logs&by=blood_bank,month&kind=in&start=2024-01-01``.
+        """
+        dataset = request.query_params.get('dataset', 'donations')
+        if dataset not in SNAPSHOT_DATASETS:
+            return Response(
+                {'error': f"dataset must be one of: {', '.join(sorted(SNAPSHOT_DATASETS))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        by = [value for value in request.query_params.get('by', 'blood_group').split(',') if value]
+        if not set(by) <= set(ROLLUP_DIMENSIONS):
+            return Response(
+                {'error': f"by must be a comma-separated subset of: {', '.join(ROLLUP_DIMENSIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start = request.query_params.get('start')
+            end = request.query_params.get('end')
+            blood_bank = request.query_params.get('blood_bank')
+            options = {
+                'kinds': request.query_params.getlist('kind') or None,
+                'blood_bank': int(blood_bank) if blood_bank else None,
+                'start': exports.parse_boundary(start) if start else None,
+                'end': exports.parse_boundary(end, end=True) if end else None,
+            }
+        except ValueError:
+            return Response({'error': 'Invalid parameters'}, status=status.HTTP_400_BAD_REQUEST)
+
+        snapshot = get_donation_snapshot(dataset)
+        return Response({
+            'dataset': dataset,
+            'by': by,
+            'results': snapshot.rollup(by, **options),
+        })
+
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
         donation = self.get_object()
-        if donation.status != 'SCHEDULED':
+        if donation.status != 'scheduled':
             return Response(
                 {'error': 'Donation is not in scheduled state'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        donation.status = 'COMPLETED'
-        donation.save()
+        with write_transaction():
+            donation.status = 'completed'
+            donation.save()
+            _log_donation(donation)
 
-        # Update donor's last donation date
-        donor = donation.donor
-        donor.last_donation = donation.completed_date
-        donor.save()
+            # Update the donor profile's last donation date; saving it also
+            # recomputes next_eligible_date
+            donor = Donor.objects.filter(user_id=donation.donor_id).first()
+            if donor is not None:
+                donor.last_donation = timezone.localdate()
+                donor.save(update_fields=['last_donation', 'updated_at'])
 
         return Response(self.get_serializer(donation).data)
 
@@ -198,7 +537,9 @@ class DonationHistoryViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return DonationHistory.objects.filter(donor__user=self.request.user)
+        return DonationHistory.objects.filter(
+            donor__user=self.request.user
+        ).select_related('donation__donor', 'donation__blood_bank')
 
 # Registration View
 class RegisterView(viewsets.ModelViewSet):
@@ -219,23 +560,40 @@ class BloodBankViewSet(viewsets.ModelViewSet):
     queryset = BloodBank.objects.all()
     serializer_class = BloodBankSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = NameCursorPagination
+
+    @method_decorator(condition(etag_func=directory_cache.list_etag,
+                                last_modified_func=directory_cache.list_last_modified))
+    def list(self, request, *args, **kwargs):
+        # Cached per URL; a 304 is returned before this runs
+        key = directory_cache.directory_cache_key('list', request.build_absolute_uri())
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, settings.BLOOD_BANK_CACHE_TIMEOUT)
+        return response
+
+    @method_decorator(condition(etag_func=directory_cache.detail_etag,
+                                last_modified_func=directory_cache.detail_last_modified))
+    def retrieve(self, request, *args, **kwargs):
+        key = directory_cache.directory_cache_key('bank', kwargs.get('pk'), 'data')
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = super().retrieve(request, *args, **kwargs)
+        cache.set(key, response.data, settings.BLOOD_BANK_CACHE_TIMEOUT)
+        return response
 
     @action(detail=True, methods=['get'])
     def availability(self, request, pk=None):
         blood_bank = self.get_object()
-        donations = Donation.objects.filter(
-            blood_bank=blood_bank,
-            status='completed'
-        ).values('blood_group', 'units')
-        
-        # Convert QuerySet to list of dicts
-        donations_list = [
-            {'blood_group': d['blood_group'], 'units': str(d['units'])}
-            for d in donations
-        ]
+        donations = Donation.objects.filter(blood_bank=blood_bank)
         
         try:
-            availability = calculate_blood_availability(donations_list)
+            availability = aggregate_blood_availability(donations)
             return Response(availability)
         except Exception as e:
             return Response(
@@ -243,6 +601,107 @@ class BloodBankViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['get'])
+    def inventory(self, request, pk=None):
+        blood_bank = self.get_object()
+        stock = Inventory.objects.filter(blood_bank=blood_bank)
+        return Response(InventorySerializer(stock, many=True).data)
+
+    @action(detail=True, methods=['get'], url_path='days-of-supply')
+    def days_of_supply(self, request, pk=None):
+        blood_bank = self.get_object()
+        try:
+            horizon = int(request.query_params.get('horizon', 7))
+        except ValueError:
+            horizon = 0
+        if not 1 <= horizon <= MAX_FORECAST_HORIZON:
+            return Response(
+                {'error': f'horizon must be between 1 and {MAX_FORECAST_HORIZON} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        forecaster = get_demand_forecaster()
+        stock = dict(
+            Inventory.objects.filter(blood_bank=blood_bank).values_list('blood_group', 'units')
+        )
+        return Response({
+            'blood_bank': blood_bank.id,
+            'horizon': horizon,
+            'forecast_through': forecaster.last_day,
+            'results': days_of_supply(forecaster, blood_bank.id, stock, horizon=horizon),
+        })
+
+    @action(detail=False, methods=['get'])
+    def stock(self, request):
+        stock = Inventory.objects.all()
+        return Response(InventorySerializer(stock, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def trends(self, request):
+        # Served from DailyInventoryRollup, so only logs rolled up so far count
+        period = request.query_params.get('period', 'month')
+        if period not in TREND_PERIODS:
+            return Response(
+                {'error': f"period must be one of: {', '.join(TREND_PERIODS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start = request.query_params.get('start')
+            end = request.query_params.get('end')
+            blood_bank = request.query_params.get('blood_bank')
+            trend = inventory_trend(
+                period,
+                blood_bank=int(blood_bank) if blood_bank else None,
+                blood_group=request.query_params.get('blood_group'),
+                start=exports.parse_boundary(start).date() if start else None,
+                end=exports.parse_boundary(end, end=True).date() if end else None
+            )
+        except ValueError:
+            return Response({'error': 'Invalid parameters'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'period': period, 'results': trend})
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export_records(request, dataset):
+    if dataset not in exports.EXPORT_DATASETS:
+        return Response(
+            {'error': f'Unknown dataset: {dataset}'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    # ?format= is reserved by DRF content negotiation
+    export_format = request.query_params.get('output', 'ndjson')
+    if export_format not in exports.EXPORT_FORMATS:
+        return Response(
+            {'error': f'output must be one of {", ".join(exports.EXPORT_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        blood_bank = request.query_params.get('blood_bank')
+        columns, rows = exports.export_rows(
+            dataset,
+            start=exports.parse_boundary(start) if start else None,
+            end=exports.parse_boundary(end, end=True) if end else None,
+            blood_bank=int(blood_bank) if blood_bank else None
+        )
+    except ValueError:
+        return Response(
+            {'error': 'Invalid parameters'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    response = StreamingHttpResponse(
+        exports.iter_export(export_format, columns, rows),
+        content_type=exports.CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{dataset}.{export_format}"'
+    return response
+
 @api_view(['GET'])
 def test_connection(request):
     return Response({
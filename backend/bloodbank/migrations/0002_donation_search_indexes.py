@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloodbank', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['is_available', 'blood_group', 'donation_date'], name='bloodbank_d_is_avai_577b4b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['is_available', 'location', 'donation_date'], name='bloodbank_d_is_avai_5a04c8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['donation_date'], name='bloodbank_d_donatio_dc7b7d_idx'),
+        ),
+    ]
@@ -50,6 +50,14 @@ class Donation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Support the search_donations filters and default ordering
+            models.Index(fields=['is_available', 'blood_group', 'donation_date']),
+            models.Index(fields=['is_available', 'location', 'donation_date']),
+            models.Index(fields=['donation_date']),
+        ]
+
     def __str__(self):
         return f"{self.donor_name} - {self.blood_group} ({self.units} units)"
 
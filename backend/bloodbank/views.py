@@ -1,6 +1,7 @@
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
+from django.utils.dateparse import parse_date
 from .models import Donation
 from api.blood_calculator_wrapper import BloodCalculator
 import json
@@ -8,6 +9,31 @@ import json
 # Initialize the blood calculator
 blood_calculator = BloodCalculator()
 
+SEARCH_ORDERINGS = ('donation_date', '-donation_date', 'units', '-units')
+DEFAULT_SEARCH_PAGE_SIZE = 50
+MAX_SEARCH_PAGE_SIZE = 200
+
+def parse_date_range(date_range):
+    """
+    Parse a donation date range.
+    
+    Accepts {"start": ..., "end": ...} or a "start,end" string of ISO
+    dates; either side may be left empty.
+    
+    Returns:
+        tuple: (start date or None, end date or None)
+    """
+    if isinstance(date_range, dict):
+        start, end = date_range.get('start'), date_range.get('end')
+    else:
+        start, _, end = str(date_range).partition(',')
+    
+    start = parse_date(start.strip()) if start else None
+    end = parse_date(end.strip()) if end else None
+    if (start is None and end is None) or (start and end and start > end):
+        raise ValueError('Invalid date_range')
+    return start, end
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def check_compatibility(request):
@@ -31,26 +57,62 @@ def search_donations(request):
     try:
         data = json.loads(request.body)
         
-        # Get all donations from the database
-        donations = list(Donation.objects.values(
-            'blood_group', 'units', 'donor_name', 'date', 'location', 'is_available'
-        ))
+        # Filter, order and page in the database; only one page is loaded
+        donations = Donation.objects.all()
+        
+        if data.get('blood_group'):
+            donations = donations.filter(blood_group=data['blood_group'])
         
-        # Convert date objects to strings
-        for donation in donations:
-            donation['date'] = donation['date'].isoformat()
+        if data.get('location'):
+            donations = donations.filter(location=data['location'])
         
-        # Search using the blood calculator
-        result = blood_calculator.search_donations(
-            donations=donations,
-            blood_group=data.get('blood_group'),
-            location=data.get('location'),
-            date_range=data.get('date_range'),
-            available_only=data.get('available_only', True)
+        if data.get('available_only', True):
+            donations = donations.filter(is_available=True)
+        
+        date_range = data.get('date_range')
+        if date_range:
+            start, end = parse_date_range(date_range)
+            if start:
+                donations = donations.filter(donation_date__gte=start)
+            if end:
+                donations = donations.filter(donation_date__lte=end)
+        
+        ordering = data.get('ordering', '-donation_date')
+        if ordering not in SEARCH_ORDERINGS:
+            return JsonResponse({'error': f'ordering must be one of {", ".join(SEARCH_ORDERINGS)}'}, status=400)
+        
+        page = int(data.get('page', 1))
+        page_size = min(int(data.get('page_size', DEFAULT_SEARCH_PAGE_SIZE)), MAX_SEARCH_PAGE_SIZE)
+        if page < 1 or page_size < 1:
+            return JsonResponse({'error': 'page and page_size must be positive'}, status=400)
+        
+        # Fetch one extra row to know whether another page exists
+        offset = (page - 1) * page_size
+        rows = list(
+            donations.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+            .values('blood_group', 'units', 'donor_name', 'donation_date', 'location', 'is_available')
+            [offset:offset + page_size + 1]
         )
         
-        return JsonResponse(result)
+        return JsonResponse({
+            'donations': [
+                {
+                    'bloodGroup': row['blood_group'],
+                    'units': row['units'],
+                    'donorName': row['donor_name'],
+                    'date': row['donation_date'].isoformat(),
+                    'location': row['location'],
+                    'isAvailable': row['is_available'],
+                }
+                for row in rows[:page_size]
+            ],
+            'page': page,
+            'page_size': page_size,
+            'has_next': len(rows) > page_size,
+        })
         
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -70,9 +70,26 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Seconds to keep a connection open across requests; a few minutes
+        # sets pragmas and the page cache up once rather than per request
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Pragmas applied to each new SQLite connection (see api.sqlite):
+# 'production' enables WAL, synchronous=NORMAL, a 5 s busy timeout, a
+# 64 MiB page cache and a 256 MiB memory map; 'default' keeps SQLite's
+# own settings and is the default. SQLITE_PRAGMAS entries override
+# single pragmas
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'default')
+SQLITE_PRAGMAS = {}
+
+# Make write-heavy views take turns on an application lock before their
+# transaction starts, instead of failing with "database is locked"; off
+# unless SQLITE_WRITE_LOCK=True
+SQLITE_WRITE_LOCK = os.getenv('SQLITE_WRITE_LOCK', 'False') == 'True'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -117,8 +134,13 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.IdCursorPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '50')),
 }
 
+# Upper bound for the ?page_size= query parameter on list endpoints
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '200'))
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -127,4 +149,66 @@ SIMPLE_JWT = {
 
 # CORS settings
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
-CORS_ALLOW_CREDENTIALS = True 
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True 
+
+# Blood calculator worker pool
+BLOOD_CALCULATOR_POOL = {
+    'SIZE': int(os.getenv('BLOOD_CALCULATOR_POOL_SIZE', '4')),
+    'MAX_QUEUE': int(os.getenv('BLOOD_CALCULATOR_POOL_MAX_QUEUE', '16')),
+    'ACQUIRE_TIMEOUT': float(os.getenv('BLOOD_CALCULATOR_ACQUIRE_TIMEOUT', '5')),
+    'HEALTH_CHECK_INTERVAL': float(os.getenv('BLOOD_CALCULATOR_HEALTH_CHECK_INTERVAL', '30')),
+    # Seconds a worker may take to answer before it is killed
+    'REQUEST_TIMEOUT': float(os.getenv('BLOOD_CALCULATOR_REQUEST_TIMEOUT', '30')),
+    # 'auto' packs large availability requests when the binary supports it;
+    # 'json' always sends JSON text
+    'WIRE_ENCODING': os.getenv('BLOOD_CALCULATOR_WIRE_ENCODING', 'auto'),
+    'PACKED_MIN_DONATIONS': int(os.getenv('BLOOD_CALCULATOR_PACKED_MIN_DONATIONS', '1000')),
+}
+
+# Donor notification outbox, delivered by `manage.py send_notifications`.
+# BACKEND is a dotted path: api.notifications.ConsoleBackend or
+# api.notifications.FileBackend (appends JSON lines to FILE_PATH)
+NOTIFICATIONS = {
+    'BACKEND': os.getenv('NOTIFICATION_BACKEND', 'api.notifications.ConsoleBackend'),
+    'FILE_PATH': os.getenv('NOTIFICATION_FILE_PATH', os.path.join(BASE_DIR, 'notifications.log')),
+    'BATCH_SIZE': int(os.getenv('NOTIFICATION_BATCH_SIZE', '100')),
+    'MAX_ATTEMPTS': int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', '5')),
+    # Seconds before the first retry, doubled per attempt up to MAX_RETRY_DELAY
+    'RETRY_BACKOFF': int(os.getenv('NOTIFICATION_RETRY_BACKOFF', '30')),
+    'MAX_RETRY_DELAY': int(os.getenv('NOTIFICATION_MAX_RETRY_DELAY', '3600')),
+    # At most RATE_LIMIT messages per donor per RATE_LIMIT_WINDOW seconds; 0 disables
+    'RATE_LIMIT': int(os.getenv('NOTIFICATION_RATE_LIMIT', '3')),
+    'RATE_LIMIT_WINDOW': int(os.getenv('NOTIFICATION_RATE_LIMIT_WINDOW', '3600')),
+    # Claims older than this many seconds are assumed abandoned and requeued
+    'LOCK_TIMEOUT': int(os.getenv('NOTIFICATION_LOCK_TIMEOUT', '300')),
+    # Donors reached by an emergency broadcast are skipped by further
+    # broadcasts for this many seconds
+    'BROADCAST_DEDUPE_WINDOW': int(os.getenv('BROADCAST_DEDUPE_WINDOW', '21600')),
+}
+
+# Minimum days between whole blood donations; drives Donor.next_eligible_date.
+# Run `manage.py recompute_eligibility` after changing it
+DONATION_DEFERRAL_DAYS = int(os.getenv('DONATION_DEFERRAL_DAYS', '90'))
+
+# Nearby donor search backend: 'orm' queries the database, 'memory' uses
+# the in-process NumPy donor locator
+DONOR_NEARBY_BACKEND = os.getenv('DONOR_NEARBY_BACKEND', 'orm')
+
+# Seconds between incremental refreshes of the in-process NumPy donation
+# snapshot used by the analytics endpoint
+DONATION_SNAPSHOT_REFRESH_INTERVAL = float(os.getenv('DONATION_SNAPSHOT_REFRESH_INTERVAL', '5'))
+
+# Seconds before the snapshot is reloaded in full, picking up bulk
+# updates, out-of-order commits and writes from other processes
+DONATION_SNAPSHOT_MAX_AGE = float(os.getenv('DONATION_SNAPSHOT_MAX_AGE', '300'))
+
+# Cache lifetime in seconds for blood bank directory responses; entries are
+# also invalidated whenever a BloodBank is saved or deleted
+BLOOD_BANK_CACHE_TIMEOUT = int(os.getenv('BLOOD_BANK_CACHE_TIMEOUT', '300'))
+
+# Rows fetched per database round trip by streaming exports
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Bulk donation uploads: rows per INSERT and rows per request
+BULK_INGEST_CHUNK_SIZE = int(os.getenv('BULK_INGEST_CHUNK_SIZE', '500'))
+BULK_INGEST_MAX_ROWS = int(os.getenv('BULK_INGEST_MAX_ROWS', '10000'))
@@ -7,6 +7,11 @@
 #include <json/json.h>
 #include <algorithm>
 #include <ctime>
+#include <cstdint>
+#ifdef _WIN32
+#include <io.h>
+#include <fcntl.h>
+#endif
 
 using namespace std;
 
@@ -125,76 +130,135 @@ Json::Value calculateAvailability(const vector<BloodDonation>& donations) {
     return result;
 }
 
-int main() {
-    try {
-        // Read JSON input from stdin
-        string input;
-        getline(cin, input);
-        
-        Json::Value root;
-        Json::Reader reader;
-        bool parsingSuccessful = reader.parse(input, root);
-        
-        if (!parsingSuccessful) {
-            throw runtime_error("Error parsing JSON input");
+// Integer codes used by the packed encoding; must match
+// api/compatibility.py BLOOD_GROUPS
+const vector<string> BLOOD_GROUP_CODES = {"A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"};
+
+// Read the binary payload that follows a packed request header: count int8
+// blood group codes, count uint8 availability flags, then count int32
+// units in native byte order
+vector<BloodDonation> readPackedDonations(istream& in, size_t count) {
+    vector<int8_t> groups(count);
+    vector<uint8_t> available(count);
+    vector<int32_t> units(count);
+    
+    in.read(reinterpret_cast<char*>(groups.data()), count);
+    in.read(reinterpret_cast<char*>(available.data()), count);
+    in.read(reinterpret_cast<char*>(units.data()), count * sizeof(int32_t));
+    if (!in) {
+        throw runtime_error("Truncated packed payload");
+    }
+    
+    vector<BloodDonation> donations(count);
+    for (size_t i = 0; i < count; ++i) {
+        if (groups[i] < 0 || groups[i] >= (int8_t)BLOOD_GROUP_CODES.size()) {
+            throw runtime_error("Invalid blood group code");
+        }
+        donations[i].bloodGroup = BLOOD_GROUP_CODES[groups[i]];
+        donations[i].units = units[i];
+        donations[i].isAvailable = available[i] != 0;
+    }
+    return donations;
+}
+
+// Process a single JSON request line and return the JSON result. Packed
+// requests read their binary payload from the same input stream.
+Json::Value handleRequest(const string& input, istream& in) {
+    Json::Value root;
+    Json::Reader reader;
+    bool parsingSuccessful = reader.parse(input, root);
+    
+    if (!parsingSuccessful) {
+        throw runtime_error("Error parsing JSON input");
+    }
+    
+    // Process the input
+    string operation = root["operation"].asString();
+    Json::Value result;
+    
+    if (operation == "ping") {
+        result["status"] = "ok";
+    }
+    else if (operation == "capabilities") {
+        result["encodings"].append("json");
+        result["encodings"].append("packed");
+    }
+    else if (operation == "check_compatibility") {
+        string donor = root["donor"].asString();
+        string recipient = root["recipient"].asString();
+        result = checkCompatibility(donor, recipient);
+    }
+    else if (operation == "search_donations") {
+        vector<BloodDonation> donations;
+        for (const auto& donation : root["donations"]) {
+            BloodDonation d;
+            d.bloodGroup = donation["blood_group"].asString();
+            d.units = donation["units"].asInt();
+            d.donorName = donation["donor_name"].asString();
+            d.date = donation["date"].asString();
+            d.location = donation["location"].asString();
+            d.isAvailable = donation["is_available"].asBool();
+            donations.push_back(d);
         }
         
-        // Process the input
-        string operation = root["operation"].asString();
-        Json::Value result;
+        string bloodGroup = root.get("blood_group", "").asString();
+        string location = root.get("location", "").asString();
+        string dateRange = root.get("date_range", "").asString();
+        bool availableOnly = root.get("available_only", true).asBool();
         
-        if (operation == "check_compatibility") {
-            string donor = root["donor"].asString();
-            string recipient = root["recipient"].asString();
-            result = checkCompatibility(donor, recipient);
-        }
-        else if (operation == "search_donations") {
-            vector<BloodDonation> donations;
-            for (const auto& donation : root["donations"]) {
-                BloodDonation d;
-                d.bloodGroup = donation["blood_group"].asString();
-                d.units = donation["units"].asInt();
-                d.donorName = donation["donor_name"].asString();
-                d.date = donation["date"].asString();
-                d.location = donation["location"].asString();
-                d.isAvailable = donation["is_available"].asBool();
-                donations.push_back(d);
-            }
-            
-            string bloodGroup = root.get("blood_group", "").asString();
-            string location = root.get("location", "").asString();
-            string dateRange = root.get("date_range", "").asString();
-            bool availableOnly = root.get("available_only", true).asBool();
-            
-            result = searchDonations(donations, bloodGroup, location, dateRange, availableOnly);
-        }
-        else if (operation == "calculate_availability") {
-            vector<BloodDonation> donations;
-            for (const auto& donation : root["donations"]) {
-                BloodDonation d;
-                d.bloodGroup = donation["blood_group"].asString();
-                d.units = donation["units"].asInt();
-                d.isAvailable = donation["is_available"].asBool();
-                donations.push_back(d);
-            }
-            
-            result = calculateAvailability(donations);
-        }
-        else {
-            throw runtime_error("Invalid operation");
+        result = searchDonations(donations, bloodGroup, location, dateRange, availableOnly);
+    }
+    else if (operation == "calculate_availability" && root.get("encoding", "json").asString() == "packed") {
+        result = calculateAvailability(readPackedDonations(in, root["count"].asUInt()));
+    }
+    else if (operation == "calculate_availability") {
+        vector<BloodDonation> donations;
+        for (const auto& donation : root["donations"]) {
+            BloodDonation d;
+            d.bloodGroup = donation["blood_group"].asString();
+            d.units = donation["units"].asInt();
+            d.isAvailable = donation["is_available"].asBool();
+            donations.push_back(d);
         }
         
-        // Output JSON result
-        Json::FastWriter writer;
-        cout << writer.write(result);
+        result = calculateAvailability(donations);
+    }
+    else {
+        throw runtime_error("Invalid operation");
+    }
+    
+    return result;
+}
+
+int main() {
+    // Serve one JSON request per line until stdin is closed, so that a
+    // single process can be reused by the Python worker pool.
+    string input;
+    int exitCode = 0;
+    Json::FastWriter writer;
+    
+#ifdef _WIN32
+    // Packed payloads are raw bytes; stop the CRT translating newlines
+    _setmode(_fileno(stdin), _O_BINARY);
+    _setmode(_fileno(stdout), _O_BINARY);
+#endif
+    
+    while (getline(cin, input)) {
+        if (input.empty()) {
+            continue;
+        }
         
-    } catch (const exception& e) {
-        Json::Value error;
-        error["error"] = e.what();
-        Json::FastWriter writer;
-        cout << writer.write(error);
-        return 1;
+        try {
+            // FastWriter terminates each document with a newline
+            cout << writer.write(handleRequest(input, cin));
+        } catch (const exception& e) {
+            Json::Value error;
+            error["error"] = e.what();
+            cout << writer.write(error);
+            exitCode = 1;
+        }
+        cout.flush();
     }
     
-    return 0;
-} 
\ No newline at end of file
+    return exitCode;
+}
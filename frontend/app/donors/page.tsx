@@ -45,7 +45,7 @@ export default function DonorsPage() {
           throw new Error('Failed to fetch donors')
         }
         const data = await response.json()
-        setDonors(data)
+        setDonors(data.results)
       } catch (err) {
         setError('Failed to load donors')
       }
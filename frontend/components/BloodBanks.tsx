@@ -55,7 +55,7 @@ export function BloodBanks() {
       }
       
       const data = await response.json();
-      setBloodBanks(data);
+      setBloodBanks(data.results);
       setLoading(false);
     } catch (error) {
       console.error('Error fetching blood banks:', error);
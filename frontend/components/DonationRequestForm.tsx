@@ -62,7 +62,7 @@ export function DonationRequestForm() {
       const response = await fetch('http://localhost:8000/api/bloodbanks/');
       if (!response.ok) throw new Error('Failed to fetch blood banks');
       const data = await response.json();
-      setBloodBanks(data);
+      setBloodBanks(data.results);
     } catch (error) {
       console.error('Error fetching blood banks:', error);
       toast({
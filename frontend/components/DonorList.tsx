@@ -37,7 +37,7 @@ export function DonorList() {
       });
       if (!response.ok) throw new Error('Failed to fetch donors');
       const data = await response.json();
-      setDonors(data);
+      setDonors(data.results);
     } catch (error) {
       console.error('Error fetching donors:', error);
       toast({